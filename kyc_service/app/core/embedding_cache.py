@@ -0,0 +1,73 @@
+"""
+On-disk cache of ID document face embeddings.
+
+Drivers often retry the selfie step, and every retry re-sends the same NID
+image. Its face embeddings are stored as `<sha256 of the image bytes>.npy`
+under KYC_EMBEDDING_CACHE_DIR, one row per detected face. A repeat
+verification memory-maps that file instead of running detection and ArcFace
+on the document again. The OS page cache shares the mapped files between the
+worker processes.
+
+Entries live in a subdirectory named after everything that shapes the
+embedding (recognition model, detector, preprocessing settings, pipeline
+version), so changing any of them starts a fresh cache instead of reusing
+stale vectors. Old
+subdirectories can be deleted at leisure; each entry is a couple of KB.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from app.core.preprocess import CROP_DOCUMENTS, MAX_DIMENSION
+from app.core.worker_pool import DETECTOR_BACKEND, MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("KYC_EMBEDDING_CACHE_DIR", os.path.join("cache", "embeddings"))
+
+# Bump when the way embeddings are computed changes in a way the names
+# below do not capture
+PIPELINE_VERSION = 2
+CACHE_VERSION = (
+    f"{MODEL_NAME}-{DETECTOR_BACKEND}-{MAX_DIMENSION}px"
+    f"-{'crop' if CROP_DOCUMENTS else 'nocrop'}-v{PIPELINE_VERSION}"
+).lower()
+VERSION_DIR = os.path.join(CACHE_DIR, CACHE_VERSION)
+
+
+def content_hash(data) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(VERSION_DIR, f"{key}.npy")
+
+
+def get(key: str) -> Optional[np.ndarray]:
+    """The (faces, dim) embedding matrix for a document hash, or None."""
+    try:
+        return np.load(_path(key), mmap_mode="r")
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        # Truncated or corrupt entry: treat as a miss, it gets rewritten
+        logger.warning(f"Unreadable embedding cache entry {key}: {e}")
+        return None
+
+
+def put(key: str, embeddings: np.ndarray):
+    os.makedirs(VERSION_DIR, exist_ok=True)
+    # Write then rename, so readers in other workers never see half a file
+    fd, tmp_path = tempfile.mkstemp(dir=VERSION_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(embeddings, dtype=np.float32))
+        os.replace(tmp_path, _path(key))
+    except OSError as e:
+        logger.warning(f"Could not cache embeddings {key}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,24 +1,133 @@
+import os
+
+import numpy as np
 from deepface import DeepFace
+from deepface.modules import preprocessing
+from app.core import embedding_cache, preprocess
+from app.core.image_io import open_image
+from app.core.worker_pool import DETECTOR_BACKEND, MODEL_NAME
+
+# DeepFace's cosine threshold for ArcFace
+COSINE_THRESHOLD = float(os.getenv("KYC_COSINE_THRESHOLD", "0.68"))
+
+
+def detect_faces(image_data, document: bool = False) -> list:
+    """Aligned face crops (RGB, 0-1) for every face in the encoded image."""
+    with open_image(image_data) as img:
+        if isinstance(img, np.ndarray):
+            img = preprocess.prepare(img, document=document)
+        faces = DeepFace.extract_faces(
+            img_path=img,
+            detector_backend=DETECTOR_BACKEND,
+            align=True,
+        )
+    return [face["face"] for face in faces]
+
+
+def embed_crops(crops: list) -> np.ndarray:
+    """
+    ArcFace embeddings for many face crops in one forward pass.
+    Same preprocessing as DeepFace.represent, so both paths share the cache.
+    """
+    model = DeepFace.build_model(MODEL_NAME)
+    height, width = model.input_shape
+    batch = np.concatenate([
+        preprocessing.resize_image(img=crop[:, :, ::-1], target_size=(width, height))
+        for crop in crops
+    ])
+    return np.asarray(model.model.predict(batch, verbose=0), dtype=np.float32)
+
+
+def embed_faces(image_data, document: bool = False) -> np.ndarray:
+    """Detects every face in the encoded image and returns a (faces, dim) matrix of embeddings."""
+    return embed_crops(detect_faces(image_data, document=document))
+
 
-def verify_identity(img1_path: str, img2_path: str):
+def min_cosine_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Smallest cosine distance between any row of a and any row of b."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return float(1 - (a @ b.T).max())
+
+
+def verify_identity(id_data, selfie_data):
     """
-    Compares two images to check if they belong to the same person.
+    Compares two encoded images to check if they belong to the same person.
+    The ID document's embeddings are cached by content.
     """
     try:
-        result = DeepFace.verify(
-            img1_path=img1_path,
-            img2_path=img2_path,
-            model_name="ArcFace",        
-            detector_backend="retinaface", 
-            distance_metric="cosine"
-        )
-        
-        # result returns a dict: {'verified': True, 'distance': 0.23, ...}
+        # 1. Document faces, from the cache when this exact image was seen before
+        doc_key = embedding_cache.content_hash(id_data)
+        doc_embeddings = embedding_cache.get(doc_key)
+        cached = doc_embeddings is not None
+        if not cached:
+            doc_embeddings = embed_faces(id_data, document=True)
+            embedding_cache.put(doc_key, doc_embeddings)
+
+        # 2. Selfie faces, always fresh
+        selfie_embeddings = embed_faces(selfie_data)
+
+        # 3. Same rule as DeepFace.verify: closest pair under the threshold
+        distance = min_cosine_distance(np.asarray(doc_embeddings), selfie_embeddings)
         return {
-            "is_match": result['verified'],
-            "similarity_score": result['distance'],
+            "is_match": distance <= COSINE_THRESHOLD,
+            "similarity_score": distance,
+            "document_cached": cached,
             "status": "success"
         }
 
     except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+
+def verify_batch(pairs: list) -> list:
+    """
+    Verifies [(index, key, id_data, selfie_data), ...].
+    Only recognition is batched: one ArcFace forward pass for every face in
+    the chunk. RetinaFace still runs once per image, since DeepFace's
+    detectors take a single frame and the frames differ in size. Cached
+    documents skip detection entirely. A pair that fails (no face found, bad
+    image) only fails itself.
+    """
+    results, crops, owners = {}, [], []
+    documents, fresh = {}, set()
+
+    # 1. Detect faces, skipping documents whose embeddings are cached
+    for index, key, id_data, selfie_data in pairs:
+        try:
+            doc_key = embedding_cache.content_hash(id_data)
+            if doc_key not in documents:
+                cached = embedding_cache.get(doc_key)
+                if cached is None:
+                    doc_crops = detect_faces(id_data, document=True)
+                    crops += doc_crops
+                    owners += [("doc", doc_key)] * len(doc_crops)
+                    fresh.add(doc_key)
+                documents[doc_key] = cached
+            selfie_crops = detect_faces(selfie_data)
+            crops += selfie_crops
+            owners += [("selfie", index)] * len(selfie_crops)
+            results[index] = {"index": index, "key": key, "doc_key": doc_key, "document_cached": doc_key not in fresh}
+        except Exception as e:
+            results[index] = {"index": index, "key": key, "status": "error", "message": str(e)}
+
+    # 2. One forward pass for the whole chunk
+    grouped = {}
+    if crops:
+        for owner, embedding in zip(owners, embed_crops(crops)):
+            grouped.setdefault(owner, []).append(embedding)
+    for doc_key in fresh:
+        documents[doc_key] = np.stack(grouped[("doc", doc_key)])
+        embedding_cache.put(doc_key, documents[doc_key])
+
+    # 3. Compare each pair
+    output = []
+    for index, _, _, _ in pairs:
+        result = results[index]
+        if "doc_key" in result:
+            distance = min_cosine_distance(
+                np.asarray(documents[result.pop("doc_key")]), np.stack(grouped[("selfie", index)])
+            )
+            result.update({"is_match": distance <= COSINE_THRESHOLD, "similarity_score": distance, "status": "success"})
+        output.append(result)
+    return output
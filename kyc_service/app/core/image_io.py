@@ -0,0 +1,132 @@
+"""
+Upload handling without the shared uploads/ directory.
+
+Request bodies are capped while they arrive: BodySizeLimit counts the bytes
+the server hands to the app and answers 413 as soon as a request passes its
+limit, so an oversized upload is cut off rather than received and spooled in
+full. Within the limit, read_form parses the multipart body with a parser
+that keeps files up to KYC_MAX_UPLOAD_MB in memory; FastAPI's File()
+parameters would spool anything past 1 MB to a temp file. Each file is then
+checked against KYC_MAX_UPLOAD_MB as it is read. Images are decoded straight from those bytes:
+np.frombuffer wraps the buffer without copying, and cv2.imdecode turns it
+into the BGR array DeepFace accepts in place of a path. Only when OpenCV
+cannot decode the bytes are they written to a private temp file, which is
+removed as soon as the caller is done with it.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.datastructures import FormData, UploadFile as StarletteUploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+MAX_UPLOAD_BYTES = int(os.getenv("KYC_MAX_UPLOAD_MB", "10")) * 1024 * 1024
+MAX_REQUEST_BYTES = int(os.getenv("KYC_MAX_REQUEST_MB", "25")) * 1024 * 1024
+MAX_BATCH_REQUEST_BYTES = int(os.getenv("KYC_MAX_BATCH_REQUEST_MB", "500")) * 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+
+
+class InMemoryMultiPartParser(MultiPartParser):
+    # Only for forms parsed by read_form; request.form() keeps Starlette's default
+    spool_max_size = MAX_UPLOAD_BYTES
+
+
+class BodySizeLimit:
+    """ASGI middleware that stops reading a request body once it passes the limit for its path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = MAX_BATCH_REQUEST_BYTES if scope["path"].startswith("/verify-identity/batch") else MAX_REQUEST_BYTES
+        # 1. Declared length: refuse before reading anything
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+            return await response(scope, receive, send)
+
+        # 2. Chunked or understated bodies: count as they arrive. The
+        # HTTPException surfaces from the form parsing as a 413 response
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_form(request: Request, max_files: int, max_fields: int = 0) -> FormData:
+    """
+    Parses a multipart body, keeping files up to MAX_UPLOAD_BYTES in memory.
+    The caller closes the form once the files are read.
+    """
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+    parser = InMemoryMultiPartParser(
+        request.headers, request.stream(), max_files=max_files, max_fields=max_fields
+    )
+    try:
+        return await parser.parse()
+    except MultiPartException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+def form_files(form: FormData, name: str) -> list:
+    """Every upload sent as `name`; 422 if there is none, like a missing File() parameter."""
+    files = [item for item in form.getlist(name) if isinstance(item, StarletteUploadFile)]
+    if not files:
+        raise HTTPException(status_code=422, detail=f"Missing file field: {name}")
+    return files
+
+
+async def read_upload(upload: UploadFile, limit: int = MAX_UPLOAD_BYTES) -> bytearray:
+    """Reads an upload into memory, rejecting it with 413 as soon as it passes `limit`."""
+    data = bytearray()
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"{upload.filename} is larger than {limit // (1024 * 1024)} MB",
+            )
+    if not data:
+        raise HTTPException(status_code=400, detail=f"{upload.filename} is empty")
+    return data
+
+
+def decode_image(data) -> np.ndarray:
+    """BGR array for encoded image bytes, or None if OpenCV cannot decode them."""
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+@contextmanager
+def open_image(data, suffix: str = ""):
+    """Yields what DeepFace accepts as img_path: a decoded array, else a temp file path."""
+    image = decode_image(data)
+    if image is not None:
+        yield image
+        return
+
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="kyc_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        yield path
+    finally:
+        os.remove(path)
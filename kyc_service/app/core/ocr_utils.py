@@ -3,7 +3,6 @@ import logging
 from dotenv import load_dotenv
 import base64
 from typing import Dict, Any
-from pathlib import Path
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
@@ -17,21 +16,16 @@ class NIDData(BaseModel):
     name: str = Field(description="Full name from the NID card")
     dob: str = Field(description="Date of birth in format DD-MM-YYYY")
 
-def extract_text(image_path: str) -> Dict[str, Any]:
+def extract_text(image_bytes: bytes) -> Dict[str, Any]:
     """
     Extract name and DOB from NID card using LangChain and GPT-4 Vision.
     
     Args:
-        image_path: Path to the NID card image
+        image_bytes: Encoded NID card image
         
     Returns:
         Dict with status, name, and dob
     """
-    path = Path(image_path)
-    
-    if not path.exists():
-        logger.error(f"Image not found: {image_path}")
-        return {"status": "error", "message": f"Image not found: {image_path}"}
 
     try:
         parser = PydanticOutputParser(pydantic_object=NIDData)
@@ -55,8 +49,7 @@ def extract_text(image_path: str) -> Dict[str, Any]:
         ])
         
         
-        with open(image_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode()
+        image_data = base64.b64encode(image_bytes).decode()
         
         chain = prompt | llm | parser
         result = chain.invoke({
@@ -64,7 +57,7 @@ def extract_text(image_path: str) -> Dict[str, Any]:
             "format_instructions": parser.get_format_instructions()
         })
         
-        logger.info(f"Extraction successful for {image_path}")
+        logger.info("Extraction successful")
         return {
             "status": "success",
             "name": result.name,
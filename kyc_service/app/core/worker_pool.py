@@ -0,0 +1,209 @@
+"""
+Process pool for face verification.
+
+DeepFace inference is CPU-bound and holds the GIL, so running it inside an
+async handler stalls every other request. Verifications run instead in a
+fixed pool of worker processes (KYC_WORKERS, default one per CPU core). Each
+worker loads ArcFace and RetinaFace once, when it starts, and the pool is
+started and warmed from the FastAPI lifespan hook, so the first request does
+not pay the model load time.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "ArcFace"
+DETECTOR_BACKEND = "retinaface"
+
+
+class PoolBusy(Exception):
+    """
+    Raised when more verifications are waiting than KYC_MAX_QUEUE allows, or
+    when a worker crashed and the pool is being rebuilt.
+    """
+
+
+def _load_models():
+    # Runs once in every worker process. A representation pass on a blank
+    # frame builds both the detector and the recognition model.
+    from deepface import DeepFace
+
+    DeepFace.represent(
+        img_path=np.zeros((224, 224, 3), dtype=np.uint8),
+        model_name=MODEL_NAME,
+        detector_backend=DETECTOR_BACKEND,
+        enforce_detection=False,
+    )
+    logger.info(f"Worker {os.getpid()} loaded {MODEL_NAME} and {DETECTOR_BACKEND}")
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _timed(func: Callable, args: tuple):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class LatencyStats:
+    """Count, mean, max and percentiles over the most recent samples."""
+
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self.samples)
+
+        def percentile(p):
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 4)
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "max": round(self.max, 4),
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        }
+
+
+class VerificationPool:
+    def __init__(self, workers: int = None, max_queue: int = None):
+        self.workers = workers or int(os.getenv("KYC_WORKERS", 0)) or os.cpu_count() or 1
+        self.max_queue = max_queue or int(os.getenv("KYC_MAX_QUEUE", 0)) or self.workers * 4
+        self.executor = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.restarts = 0
+        self._restart_lock = asyncio.Lock()
+        # Bulk jobs from every batch request share half the workers, so
+        # single verifications from driver onboarding keep flowing
+        self.batch_slots_total = max(1, self.workers // 2)
+        self.batch_slots = None
+        self.batch_running = 0
+        self.inference = LatencyStats()
+        self.end_to_end = LatencyStats()
+
+    async def start(self):
+        if self.batch_slots is None:
+            # Created on the serving loop; kept across pool restarts
+            self.batch_slots = asyncio.Semaphore(self.batch_slots_total)
+        # Spawned (not forked) workers so no TensorFlow state leaks in from
+        # the parent
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_models,
+        )
+        # Workers start lazily; one job per slot makes every worker spawn
+        # and finish loading its models before we accept traffic
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, _ready) for _ in range(self.workers)
+        ])
+        logger.info(
+            f"Verification pool ready: {len(set(pids))} workers in {time.perf_counter() - started:.1f}s"
+        )
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def _restart(self, broken: ProcessPoolExecutor):
+        async with self._restart_lock:
+            if self.executor is not broken:
+                # Another request already rebuilt it
+                return
+            logger.error("Verification pool broken, restarting workers")
+            self.executor = None
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.restarts += 1
+            await self.start()
+
+    def saturated(self) -> bool:
+        return self.in_flight - self.workers >= self.max_queue
+
+    async def run(self, func: Callable, *args, admit: bool = True):
+        """
+        Runs func(*args) in a worker without blocking the event loop.
+        admit=False skips the queue limit, for callers that pace themselves.
+        """
+        if admit and self.saturated():
+            self.rejected += 1
+            raise PoolBusy(f"{self.in_flight} verifications in progress")
+
+        executor = self.executor
+        if executor is None:
+            # Not started yet, or being rebuilt. run_in_executor(None) would
+            # run DeepFace in a thread of this process instead
+            self.rejected += 1
+            raise PoolBusy("Verification workers are not running")
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result, seconds = await loop.run_in_executor(executor, _timed, func, args)
+        except BrokenProcessPool:
+            # A worker died (TensorFlow OOM, segfault); the executor refuses
+            # all further work, so replace it
+            await self._restart(executor)
+            raise PoolBusy("A verification worker crashed; the pool was restarted")
+        finally:
+            self.in_flight -= 1
+        self.inference.add(seconds)
+        self.end_to_end.add(time.perf_counter() - started)
+        return result
+
+    async def run_batch_job(self, func: Callable, *args):
+        """Like run(), but waits for one of the batch slots shared by all batch requests."""
+        if self.batch_slots is None:
+            raise PoolBusy("Verification workers are not running")
+        async with self.batch_slots:
+            self.batch_running += 1
+            try:
+                return await self.run(func, *args, admit=False)
+            finally:
+                self.batch_running -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "batch_jobs_running": self.batch_running,
+            "batch_slots": self.batch_slots_total,
+            "inference_seconds": self.inference.snapshot(),
+            "request_seconds": self.end_to_end.snapshot(),
+        }
+
+
+pool = VerificationPool()
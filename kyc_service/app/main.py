@@ -1,8 +1,15 @@
 from app.core.ocr_utils import extract_text
-from fastapi import FastAPI, File, UploadFile
-import shutil
+import asyncio
+import json
 import os
-from app.core.face_utils import verify_identity
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.core.face_utils import verify_batch, verify_identity
+from app.core.preprocess import for_ocr
+from app.core.image_io import BodySizeLimit, form_files, read_form, read_upload
+from app.core.worker_pool import PoolBusy, pool
 import logging
 from dotenv import load_dotenv
 
@@ -14,57 +21,131 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
-app = FastAPI(title="IdentityGuard KYC API", version="1.0")
+# Pairs per worker job (one recognition forward pass) and per request
+BATCH_SIZE = int(os.getenv("KYC_BATCH_SIZE", "16"))
+MAX_BATCH_PAIRS = int(os.getenv("KYC_MAX_BATCH_PAIRS", "256"))
 
-# Ensure the uploads folder exists
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the face models into every worker before serving requests
+    await pool.start()
+    yield
+    pool.shutdown()
 
-@app.get("/")
-def home():
-    return {"message": "IdentityGuard System is Online"}
 
+app = FastAPI(title="IdentityGuard KYC API", version="1.0", lifespan=lifespan)
 
-@app.post("/verify-identity/")
-async def verify_user_identity(id_card: UploadFile = File(...), selfie: UploadFile = File(...)):
-    print("Django Called ME!!!")
-    # 1. Define the paths
-    # FIX: We use os.path.join and os.path.abspath to make Windows happy
-    id_filename = os.path.join(UPLOAD_DIR, id_card.filename)
-    selfie_filename = os.path.join(UPLOAD_DIR, selfie.filename)
 
-    # 2. Save the uploaded files
-    with open(id_filename, "wb") as buffer:
-        shutil.copyfileobj(id_card.file, buffer)
+app.add_middleware(BodySizeLimit)
 
-    with open(selfie_filename, "wb") as buffer:
-        shutil.copyfileobj(selfie.file, buffer)
 
-    # 3. Convert to Absolute Paths for DeepFace
-    id_absolute_path = os.path.abspath(id_filename)
-    selfie_absolute_path = os.path.abspath(selfie_filename)
+@app.get("/")
+def home():
+    return {"message": "IdentityGuard System is Online"}
 
-    # 4. Run the AI comparison
-    result = verify_identity(id_absolute_path, selfie_absolute_path)
 
-    return result
+@app.get("/metrics")
+def metrics():
+    return pool.metrics()
 
 
-@app.post("/extract-id-data/")
-async def extract_id_data(id_card: UploadFile = File(...)):
+@app.post("/verify-identity/")
+async def verify_user_identity(request: Request):
+    """Multipart fields: id_card, selfie."""
+    # 1. Read both images into memory (nothing is written to disk)
+    form = await read_form(request, max_files=2)
+    try:
+        id_data = await read_upload(form_files(form, "id_card")[0])
+        selfie_data = await read_upload(form_files(form, "selfie")[0])
+    finally:
+        await form.close()
+
+    # 2. Run the AI comparison in the worker pool
+    try:
+        result = await pool.run(verify_identity, id_data, selfie_data)
+    except PoolBusy as e:
+        # 503 lets the caller retry later
+        raise HTTPException(status_code=503, detail=str(e))
 
-    # 1. Save file
-    file_location = os.path.join(UPLOAD_DIR, id_card.filename)
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(id_card.file, buffer)
+    return result
 
-    # 2. Convert to Absolute Path
-    abs_path = os.path.abspath(file_location)
 
-    # 3. Run OCR
-    result = extract_text(abs_path)
+async def _run_chunk(chunk):
+    try:
+        return await pool.run_batch_job(verify_batch, chunk)
+    except Exception as e:
+        # Worker crashed; report the chunk and carry on
+        return [{"index": index, "key": key, "status": "error", "message": str(e)}
+                for index, key, _, _ in chunk]
+
+
+async def _stream_batch(chunks):
+    # Every chunk queues for the pool's shared batch slots, so concurrent
+    # batch requests together never take more than half the workers
+    tasks = [asyncio.ensure_future(_run_chunk(chunk)) for chunk in chunks]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            for result in await finished:
+                yield json.dumps(result) + "\n"
+    finally:
+        # Client went away: drop chunks that have not started yet
+        for task in tasks:
+            task.cancel()
+
+
+async def _read_pairs(form):
+    """Checks the batch form and reads every pair into memory."""
+    id_cards, selfies = form_files(form, "id_cards"), form_files(form, "selfies")
+    keys = [key for key in form.getlist("keys") if isinstance(key, str)]
+    if len(id_cards) != len(selfies):
+        raise HTTPException(status_code=400, detail="id_cards and selfies must pair up")
+    if len(id_cards) > MAX_BATCH_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PAIRS} pairs per request")
+    keys = keys or [str(index) for index in range(len(id_cards))]
+    if len(keys) != len(id_cards):
+        raise HTTPException(status_code=400, detail="keys must have one entry per pair")
+    if pool.saturated():
+        raise HTTPException(status_code=503, detail="Verification pool is busy")
+
+    pairs = []
+    for index, (id_card, selfie) in enumerate(zip(id_cards, selfies)):
+        pairs.append((index, keys[index], await read_upload(id_card), await read_upload(selfie)))
+    return pairs
+
+
+@app.post("/verify-identity/batch/")
+async def verify_identity_batch(request: Request):
+    """
+    Verifies id_cards[i] against selfies[i] for every i (repeated multipart
+    fields, plus optional repeated keys). Results stream back as NDJSON, one
+    line per pair in completion order, tagged with the pair's index and
+    keys[i] (defaults to the index).
+    """
+    # 1. Read every image into memory
+    form = await read_form(request, max_files=2 * MAX_BATCH_PAIRS, max_fields=MAX_BATCH_PAIRS)
+    try:
+        pairs = await _read_pairs(form)
+    finally:
+        await form.close()
+
+    # 2. Verify in chunks, streaming each chunk's results as it finishes
+    chunks = [pairs[start:start + BATCH_SIZE] for start in range(0, len(pairs), BATCH_SIZE)]
+    return StreamingResponse(_stream_batch(chunks), media_type="application/x-ndjson")
 
-    return result
 
+@app.post("/extract-id-data/")
+async def extract_id_data(request: Request):
+    """Multipart field: id_card."""
+    # 1. Read the image into memory
+    form = await read_form(request, max_files=1)
+    try:
+        id_data = await read_upload(form_files(form, "id_card")[0])
+    finally:
+        await form.close()
+
+    # 2. Shrink and crop the photo, then run OCR off the event loop
+    prepared = await run_in_threadpool(for_ocr, id_data)
+    result = await run_in_threadpool(extract_text, prepared)
 
+    return result
@@ -0,0 +1,109 @@
+"""
+Measures what preprocessing saves on the sample images in uploads/.
+
+For every image it reports:
+  * the base64 payload the OCR prompt carries, raw vs preprocessed,
+  * the time spent preprocessing,
+  * with --detect, RetinaFace detection time on the full frame vs the
+    preprocessed one (loads DeepFace, so the first image includes warm-up
+    unless --warmup is given).
+
+Run from kyc_service/:
+    python -m benchmarks.bench_preprocess [--dir uploads] [--repeat 5] [--detect] [--document]
+"""
+import argparse
+import base64
+import os
+import statistics
+import time
+
+from app.core import preprocess
+from app.core.image_io import decode_image
+
+EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def timed(func, repeat):
+    """Median seconds over `repeat` runs, and the last result."""
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def detect(image):
+    from deepface import DeepFace
+    from app.core.worker_pool import DETECTOR_BACKEND
+
+    return DeepFace.extract_faces(img_path=image, detector_backend=DETECTOR_BACKEND, enforce_detection=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="uploads", help="Folder of sample images (default: uploads)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, median reported")
+    parser.add_argument("--document", action="store_true", help="Also crop to the card outline (ID photos)")
+    parser.add_argument("--detect", action="store_true", help="Also time face detection")
+    parser.add_argument("--warmup", action="store_true", help="Load the detector before timing")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.dir, name) for name in os.listdir(args.dir)
+        if name.lower().endswith(EXTENSIONS)
+    )
+    if not paths:
+        raise SystemExit(f"No images in {args.dir}")
+    if args.detect and args.warmup:
+        with open(paths[0], "rb") as f:
+            detect(decode_image(f.read()))
+
+    header = f"{'image':<24} {'size':>11} {'->':>11} {'payload KB':>10} {'->':>7} {'saved':>6} {'prep ms':>8}"
+    if args.detect:
+        header += f" {'detect ms':>10} {'->':>7}"
+    print(header)
+
+    raw_total = prepared_total = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        image = decode_image(data)
+        if image is None:
+            print(f"{os.path.basename(path):<24} cannot be decoded, skipped")
+            continue
+
+        # OCR path: decode + prepare + JPEG, as /extract-id-data/ does
+        prep_seconds, jpeg = timed(
+            lambda: preprocess.encode_jpeg(preprocess.prepare(decode_image(data), document=args.document)),
+            args.repeat,
+        )
+        prepared = preprocess.prepare(image, document=args.document)
+        raw_payload = len(base64.b64encode(data))
+        prepared_payload = len(base64.b64encode(jpeg))
+        raw_total += raw_payload
+        prepared_total += prepared_payload
+
+        height, width = image.shape[:2]
+        out_height, out_width = prepared.shape[:2]
+        line = (
+            f"{os.path.basename(path)[:24]:<24} {f'{width}x{height}':>11} {f'{out_width}x{out_height}':>11} "
+            f"{raw_payload / 1024:>10.0f} {prepared_payload / 1024:>7.0f} "
+            f"{1 - prepared_payload / raw_payload:>6.0%} {prep_seconds * 1000:>8.1f}"
+        )
+        if args.detect:
+            full_seconds, _ = timed(lambda: detect(image), args.repeat)
+            small_seconds, _ = timed(lambda: detect(prepared), args.repeat)
+            line += f" {full_seconds * 1000:>10.0f} {small_seconds * 1000:>7.0f}"
+        print(line)
+
+    if raw_total:
+        print(
+            f"\nOCR payload: {raw_total / 1024:.0f} KB -> {prepared_total / 1024:.0f} KB "
+            f"({1 - prepared_total / raw_total:.0%} smaller), "
+            f"max dimension {preprocess.MAX_DIMENSION}px, JPEG quality {preprocess.JPEG_QUALITY}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Redis cache backend with hit/miss counters.
+
+Every alias in settings.CACHES uses its own KEY_PREFIX, which also names
+its counters. Each process tallies hits and misses in memory and adds them
+to the shared `cache:metrics` hash at most once every
+CACHE_METRICS_FLUSH_INTERVAL seconds, so counting costs no extra round trip
+per lookup. `manage.py cache_stats` prints the totals.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "cache:metrics"
+
+_MISSING = object()
+_lock = threading.Lock()
+_counts = {}
+_last_flush = [time.monotonic()]
+
+
+class InstrumentedRedisCache(RedisCache):
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            self._record(0, 1)
+            return default
+        self._record(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        self._record(len(found), len(keys) - len(found))
+        return found
+
+    def _record(self, hits, misses):
+        with _lock:
+            counts = _counts.setdefault(self.key_prefix, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+            now = time.monotonic()
+            if now - _last_flush[0] < settings.CACHE_METRICS_FLUSH_INTERVAL:
+                return
+            pending = dict(_counts)
+            _counts.clear()
+            _last_flush[0] = now
+
+        try:
+            pipe = self._cache.get_client(write=True).pipeline(transaction=False)
+            for prefix, (prefix_hits, prefix_misses) in pending.items():
+                pipe.hincrby(METRICS_KEY, f"{prefix}:hits", prefix_hits)
+                pipe.hincrby(METRICS_KEY, f"{prefix}:misses", prefix_misses)
+            pipe.execute()
+        except Exception as e:
+            # Metrics are best effort; never fail the lookup because of them
+            logger.warning(f"Could not record cache metrics: {e}")
+
+    def metrics(self):
+        """{prefix: {'hits', 'misses'}} summed over every process."""
+        raw = self._cache.get_client().hgetall(METRICS_KEY)
+        result = {}
+        for field, value in raw.items():
+            prefix, kind = field.decode().rsplit(':', 1)
+            result.setdefault(prefix, {'hits': 0, 'misses': 0})[kind] = int(value)
+        return result
@@ -0,0 +1,22 @@
+"""
+Cursor (keyset) pagination for the long list endpoints. A page is fetched
+with `WHERE created_at < <cursor>` on an index, so deep pages cost the same
+as the first one, unlike OFFSET paging. Each ordering ends with the primary
+key so rows sharing a timestamp keep a stable order.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class DateJoinedCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-date_joined', '-user_id')
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-id',)
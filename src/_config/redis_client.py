@@ -0,0 +1,15 @@
+import redis
+from django.conf import settings
+
+_pool = None
+
+
+def get_redis():
+    """
+    Returns a Redis client for live app data (driver index, buffers, counters).
+    All clients in a process share one connection pool.
+    """
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(settings.REDIS_DATA_URL, decode_responses=True)
+    return redis.Redis(connection_pool=_pool)
@@ -144,10 +144,104 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared Django cache, one alias (and key prefix) per subsystem
+REDIS_LOCATION = os.getenv('REDIS_LOCATION') or f'redis://{REDIS_HOST}:{REDIS_PORT}/3'
+CACHE_MAX_CONNECTIONS = int(os.getenv('CACHE_MAX_CONNECTIONS', 50))
+CACHE_METRICS_FLUSH_INTERVAL = float(os.getenv('CACHE_METRICS_FLUSH_INTERVAL', 10))
+
+
+def _redis_cache(prefix, timeout=300):
+    return {
+        'BACKEND': 'src._config.cache.InstrumentedRedisCache',
+        'LOCATION': REDIS_LOCATION,
+        'KEY_PREFIX': prefix,
+        'TIMEOUT': timeout,
+        'OPTIONS': {'max_connections': CACHE_MAX_CONNECTIONS},
+    }
+
+
+CACHES = {
+    'default': _redis_cache('app'),
+    'otp': _redis_cache('otp'),
+    'fares': _redis_cache('fares', 600),
+    'static': _redis_cache('static', None),
+    'stats': _redis_cache('stats', 60),
+}
+
+# Live app data (driver geo index etc.) lives in its own Redis DB
+REDIS_DATA_URL = os.getenv('REDIS_DATA_URL', f'redis://{REDIS_HOST}:{REDIS_PORT}/2')
+
+# Drivers that have not pinged for this many seconds drop out of the nearby search
+DRIVER_LOCATION_TTL = int(os.getenv('DRIVER_LOCATION_TTL', 120))
+
+# Buffered location pings are written to DriverProfile.last_location in bulk
+DRIVER_LOCATION_FLUSH_INTERVAL = float(os.getenv('DRIVER_LOCATION_FLUSH_INTERVAL', 5))
+DRIVER_LOCATION_FLUSH_BATCH_SIZE = int(os.getenv('DRIVER_LOCATION_FLUSH_BATCH_SIZE', 1000))
+
+# The discovery socket re-reads the driver's online/active flags at most this
+# often (seconds); going online/offline over REST updates open sockets at once
+DRIVER_SOCKET_PROFILE_REFRESH = float(os.getenv('DRIVER_SOCKET_PROFILE_REFRESH', 10))
+
+# Trip telemetry fan-out to ride_<id> groups: 'direct' sends from the request,
+# 'celery' hands the send to a worker. Pings that moved less than the minimum
+# distance, or arrive faster than the minimum interval, are not re-sent.
+TRIP_LOCATION_FANOUT = os.getenv('TRIP_LOCATION_FANOUT', 'direct')
+TRIP_LOCATION_MIN_DISTANCE_M = float(os.getenv('TRIP_LOCATION_MIN_DISTANCE_M', 10))
+TRIP_LOCATION_MIN_INTERVAL = float(os.getenv('TRIP_LOCATION_MIN_INTERVAL', 1))
+
+# How often each worker checks whether an admin changed the fare settings
+PRICE_CONFIG_RECHECK_INTERVAL = float(os.getenv('PRICE_CONFIG_RECHECK_INTERVAL', 1))
+
+# Upper bound on trips priced by one bulk quote request
+BULK_QUOTE_MAX_TRIPS = int(os.getenv('BULK_QUOTE_MAX_TRIPS', 50000))
+
+# Fares and ETAs: 'straight_line' or 'osm' (offline road graph from an OSM XML extract)
+ROUTING_ENGINE = os.getenv('ROUTING_ENGINE', 'straight_line')
+ROAD_GRAPH_PATH = os.getenv('ROAD_GRAPH_PATH', str(BASE_DIR / 'data' / 'aruba.osm'))
+ROUTE_CACHE_SIZE = int(os.getenv('ROUTE_CACHE_SIZE', 10000))
+
+# Ride dispatch waves as (radius_km, drivers offered); the next wave starts
+# after DISPATCH_WAVE_TIMEOUT seconds if nobody accepted
+DISPATCH_WAVES = [(2, 5), (5, 10), (10, 20)]
+DISPATCH_WAVE_TIMEOUT = int(os.getenv('DISPATCH_WAVE_TIMEOUT', 15))
+
+# Optional batch matcher: pairs open rides and free drivers every MATCHING_WINDOW
+# seconds by minimum total pickup distance instead of dispatch waves
+BATCH_MATCHING_ENABLED = os.getenv('BATCH_MATCHING_ENABLED', 'False') == 'True'
+MATCHING_WINDOW = float(os.getenv('MATCHING_WINDOW', 2))
+MATCHING_MAX_PICKUP_KM = float(os.getenv('MATCHING_MAX_PICKUP_KM', 10))
+MATCHING_OFFER_TIMEOUT = int(os.getenv('MATCHING_OFFER_TIMEOUT', 15))
+MATCHING_MAX_BATCH = int(os.getenv('MATCHING_MAX_BATCH', 200))
+
+# Admin dashboard revenue/signup rollups: refresh period (seconds) and how many
+# past days each refresh recomputes
+DASHBOARD_ROLLUP_INTERVAL = float(os.getenv('DASHBOARD_ROLLUP_INTERVAL', 300))
+DASHBOARD_ROLLUP_LOOKBACK_DAYS = int(os.getenv('DASHBOARD_ROLLUP_LOOKBACK_DAYS', 3))
+
+# A queued selfie verification still unfinished after this many seconds is
+# given up (lost Celery message, dead worker) and the driver may resubmit.
+# Covers 4 attempts of the 90s KYC request plus retry delays.
+KYC_VERIFICATION_TIMEOUT = int(os.getenv('KYC_VERIFICATION_TIMEOUT', 600))
+
 CELERY_BROKER_URL = os.getenv('REDIS_URL', f'redis://{REDIS_HOST}:{REDIS_PORT}/0')
 CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', f'redis://{REDIS_HOST}:{REDIS_PORT}/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    'flush-driver-locations': {
+        'task': 'src.apps.drivers.tasks.flush_driver_locations',
+        'schedule': DRIVER_LOCATION_FLUSH_INTERVAL,
+    },
+    'refresh-dashboard-rollups': {
+        'task': 'src.apps.dashboard.tasks.refresh_dashboard_rollups',
+        'schedule': DASHBOARD_ROLLUP_INTERVAL,
+    },
+}
+if BATCH_MATCHING_ENABLED:
+    CELERY_BEAT_SCHEDULE['batch-match-rides'] = {
+        'task': 'src.apps.riders.tasks.task_run_batch_matching',
+        'schedule': MATCHING_WINDOW,
+    }
 
 GDAL_LIBRARY_PATH = "/usr/lib/x86_64-linux-gnu/libgdal.so"
 GEOS_LIBRARY_PATH = "/usr/lib/x86_64-linux-gnu/libgeos_c.so"
@@ -47,6 +47,7 @@ rider_pattern = [
 driver_pattern = [
     path("driver-onboarding/",driver_accounts.DriverOnboardingView.as_view(),name="onboarding"),
     path("verify-KYC/",driver_accounts.DriverSelfieVerifyView.as_view(),name="match-selfie"),
+    path("verify-KYC/<int:verification_id>/",driver_accounts.KYCVerificationStatusView.as_view(),name="kyc-status"),
     path("location-update/",drivers.UpdateDriverLocationView.as_view(),name="location_update"),
     path("available-for-rides/",drivers.AvailableRidesView.as_view(),name="check all available rider list"),
     path("accept-ride/<int:ride_id>/",drivers.AcceptRideView.as_view(),name="accept_riders"),
@@ -76,6 +77,7 @@ dashboard_patterns = [
     path("admin/notifications/", dashboard.AdminNotificationListView.as_view(), name="admin_notifications"),
     path("admin/pricing/", dashboard.AdminPriceConfigView.as_view(), name="admin_pricing"),
     path("admin/pricing/<int:pk>/", dashboard.AdminPriceConfigView.as_view(), name="admin_pricing_detail"),
+    path("admin/pricing/bulk-quote/", dashboard.AdminBulkFareQuoteView.as_view(), name="admin_pricing_bulk_quote"),
     path("admin/profile/", dashboard.AdminProfileView.as_view(), name="admin_profile"),
     path("admin/password/", dashboard.AdminPasswordUpdateView.as_view(), name="admin_password"),
 ]
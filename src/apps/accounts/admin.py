@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User,DriverProfile
+from .models import User,DriverProfile,KYCVerification
 # Register your models here.
 admin.site.register(User)
 
@@ -15,4 +15,10 @@ class DriverProfileAdmin(admin.ModelAdmin):
         # Update the User model as well
         for profile in queryset:
             profile.user.is_driver = True
-            profile.user.save()
\ No newline at end of file
+            profile.user.save()
+
+
+@admin.register(KYCVerification)
+class KYCVerificationAdmin(admin.ModelAdmin):
+    list_display = ['driver', 'status', 'created_at', 'completed_at']
+    list_filter = ['status']
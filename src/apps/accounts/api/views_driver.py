@@ -3,36 +3,12 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.db import transaction
-from ..models import DriverProfile, VehicleImage
+from django.urls import reverse
+from ..models import DriverProfile, VehicleImage, KYCVerification
 from ..serializers_driver import DriverProfileSerializer
-import requests
-import os
+from ..services import KYC_MESSAGES, expire_stale_kyc
+from ..tasks import task_verify_kyc
 
-def verify_image_ai(selfie_file, document_file):
-    """
-    Sends images to the FastAPI service for identity verification.
-    """
-    print("django called me!!!")
-    url = os.getenv("KYC_SERVICE_URL", "http://kyc_service:8000/verify-identity/")
-    
-    try:
-        selfie_file.seek(0)
-        document_file.seek(0)
-        files = {
-            'id_card': document_file,
-            'selfie': selfie_file
-        }
-        
-        response = requests.post(url, files=files, timeout=90)
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("is_match", False)
-        return False
-    except Exception as e:
-        print(f"AI Verification Error: {e}")
-        return False
-    
 class DriverOnboardingView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
@@ -81,20 +57,40 @@ class DriverSelfieVerifyView(APIView):
         if not selfie:
             return Response({"error": "Selfie image is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        is_verified = verify_image_ai(selfie, profile.nid_front.file)
+        if profile.ai_verified:
+            return Response({"error": "Your selfie is already verified."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if is_verified:
-            profile.ai_verified = True
-            profile.save()
-            
-            # Optional: Notify Admin here via Signal or Email
-            
-            return Response({
-                "status": "success",
-                "message": "AI Verification successful! Your profile is now under final review by our team."
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                "status": "failed",
-                "error": "Face verification failed. Please ensure your selfie matches your NID and try again."
-            }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        # 1. One verification in flight per driver. One stuck past the task
+        # timeout (lost message, dead worker) is given up so the driver can retry
+        expire_stale_kyc(profile.kyc_verifications.all())
+        verification = profile.kyc_verifications.filter(status__in=['PENDING', 'PROCESSING']).first()
+        if not verification:
+            verification = KYCVerification.objects.create(driver=profile, selfie=selfie)
+            # 2. Face matching runs on a Celery worker, not in this request
+            transaction.on_commit(lambda: task_verify_kyc.delay(verification.id))
+
+        return Response({
+            "status": verification.status,
+            "verification_id": verification.id,
+            "status_url": reverse("kyc-status", args=[verification.id]),
+            "message": "Selfie received. We will notify you once verification completes."
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class KYCVerificationStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, verification_id):
+        verifications = KYCVerification.objects.filter(id=verification_id, driver__user=request.user)
+        expire_stale_kyc(verifications)
+        verification = verifications.first()
+        if not verification:
+            return Response({"error": "Verification not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "verification_id": verification.id,
+            "status": verification.status,
+            "message": KYC_MESSAGES.get(verification.status, "Verification in progress."),
+            "created_at": verification.created_at,
+            "completed_at": verification.completed_at,
+        })
@@ -0,0 +1,112 @@
+import json
+from contextlib import ExitStack
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from src.apps.accounts.models import DriverProfile, KYCVerification
+from src.apps.accounts.services import KYC_SERVICE_URL
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-runs face verification for every driver through the KYC service's batch endpoint, "
+        "e.g. after a model upgrade. Reports only, unless --apply is given"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--driver', help="Only re-verify this driver (user id)")
+        parser.add_argument('--batch-size', type=int, default=32, help="Pairs per request (default 32)")
+        parser.add_argument('--url', default=KYC_SERVICE_URL.rstrip('/') + '/batch/', help="Batch endpoint URL")
+        parser.add_argument('--apply', action='store_true', help="Record the results and update ai_verified")
+
+    def handle(self, *args, **options):
+        profiles = DriverProfile.objects.exclude(nid_front='').select_related('user').order_by('id')
+        if options['driver']:
+            profiles = profiles.filter(user_id=options['driver'])
+
+        totals = {'VERIFIED': 0, 'FAILED': 0, 'ERROR': 0, 'changed': 0, 'skipped': 0}
+        batch = []
+        for profile in profiles.iterator():
+            batch.append(profile)
+            if len(batch) == options['batch_size']:
+                self.run_batch(batch, options, totals)
+                batch = []
+        if batch:
+            self.run_batch(batch, options, totals)
+
+        verb = "Updated" if options['apply'] else "Would update"
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['VERIFIED']} verified, {totals['FAILED']} failed, {totals['ERROR']} errors, "
+            f"{totals['skipped']} without a selfie. {verb} {totals['changed']} driver(s)"
+        ))
+
+    def selfies(self, profiles):
+        """Latest verified KYC selfie per driver, else latest selfie, else the profile photo."""
+        found = {}
+        verifications = (
+            KYCVerification.objects.filter(driver__in=profiles).exclude(selfie='')
+            .order_by('driver_id', '-created_at').values_list('driver_id', 'status', 'selfie')
+        )
+        for driver_id, status, selfie in verifications:
+            if driver_id not in found or (status == 'VERIFIED' and found[driver_id][0] != 'VERIFIED'):
+                found[driver_id] = (status, selfie)
+        return {
+            profile.id: found[profile.id][1] if profile.id in found else profile.user_photo.name
+            for profile in profiles
+        }
+
+    def run_batch(self, profiles, options, totals):
+        selfies = self.selfies(profiles)
+        pairs = [profile for profile in profiles if selfies[profile.id]]
+        totals['skipped'] += len(profiles) - len(pairs)
+        if not pairs:
+            return
+        by_id = {str(profile.id): profile for profile in pairs}
+
+        # 1. Upload the pairs and handle each result as the service streams it
+        with ExitStack() as stack:
+            files = []
+            for profile in pairs:
+                selfie = profile.user_photo.storage.open(selfies[profile.id], 'rb')
+                files.append(('id_cards', (profile.nid_front.name, stack.enter_context(profile.nid_front.open('rb')))))
+                files.append(('selfies', (selfies[profile.id], stack.enter_context(selfie))))
+            try:
+                response = stack.enter_context(requests.post(
+                    options['url'], files=files, data={'keys': list(by_id)}, stream=True, timeout=600
+                ))
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        result = json.loads(line)
+                        profile = by_id[result['key']]
+                        self.record_result(profile, selfies[profile.id], result, options, totals)
+            except requests.RequestException as e:
+                raise CommandError(f"KYC service batch request failed: {e}")
+
+    def record_result(self, profile, selfie, result, options, totals):
+        # 2. Compare with the stored verdict
+        if result.get('status') != 'success':
+            status = 'ERROR'
+            self.stderr.write(f"Driver {profile.user_id}: {result.get('message')}")
+        else:
+            status = 'VERIFIED' if result['is_match'] else 'FAILED'
+        totals[status] += 1
+
+        changed = status != 'ERROR' and (status == 'VERIFIED') != profile.ai_verified
+        if changed:
+            totals['changed'] += 1
+            self.stdout.write(
+                f"Driver {profile.user_id} ({profile.user.full_name}): "
+                f"ai_verified {profile.ai_verified} -> {status == 'VERIFIED'} "
+                f"(distance {result['similarity_score']:.3f})"
+            )
+        if options['apply']:
+            KYCVerification.objects.create(
+                driver=profile, selfie=selfie, status=status,
+                error=result.get('message', ''), completed_at=timezone.now()
+            )
+            if changed:
+                profile.ai_verified = status == 'VERIFIED'
+                profile.save(update_fields=['ai_verified'])
@@ -26,6 +26,11 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-date_joined', '-user_id'], name='user_date_joined_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.email})"
 
@@ -90,4 +95,24 @@ class PendingDriverUpdate(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Pending Update for {self.driver.user.full_name}"
\ No newline at end of file
+        return f"Pending Update for {self.driver.user.full_name}"
+
+class KYCVerification(models.Model):
+    """One selfie-vs-NID face match, run in the background by a Celery worker."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('VERIFIED', 'Verified'),
+        ('FAILED', 'Failed'),
+        ('ERROR', 'Error'),
+    ]
+
+    driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='kyc_verifications')
+    selfie = models.ImageField(upload_to='drivers/kyc/selfies/')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"KYC {self.id} for {self.driver.user.full_name} - {self.status}"
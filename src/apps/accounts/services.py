@@ -1,18 +1,29 @@
+import logging
+import os
 import random
-from django.core.cache import cache
+import requests
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import caches
 from django.core.mail import send_mail
 from django.conf import settings
+from datetime import timedelta
+from django.utils import timezone
+from src.apps.dashboard.models import Notification
+from src.apps.riders.dispatch import driver_group
+
+logger = logging.getLogger(__name__)
 
 class OTPService:
     @staticmethod
     def generate_otp(email):
         otp = str(random.randint(100000, 999999))
-        cache.set(f"otp_{email}", otp, timeout=300)
+        caches['otp'].set(f"otp_{email}", otp, timeout=300)
         return otp
 
     @staticmethod
     def verify_otp(email, otp):
-        cached_otp = cache.get(f"otp_{email}")
+        cached_otp = caches['otp'].get(f"otp_{email}")
         return cached_otp == otp
 
     @staticmethod
@@ -38,4 +49,86 @@ class SupportService:
             user_email,
             [settings.ADMIN_SUPPORT_EMAIL],
             fail_silently=False,
-        )
\ No newline at end of file
+        )
+
+
+KYC_SERVICE_URL = os.getenv("KYC_SERVICE_URL", "http://kyc_service:8000/verify-identity/")
+
+
+class KYCServiceError(Exception):
+    """The KYC service could not give an answer (unreachable, timeout, 5xx)."""
+
+
+def verify_image_ai(selfie_file, document_file):
+    """
+    Sends images to the FastAPI service for identity verification.
+    Returns whether the faces match; raises KYCServiceError if there is no verdict.
+    """
+    try:
+        selfie_file.seek(0)
+        document_file.seek(0)
+        files = {
+            'id_card': document_file,
+            'selfie': selfie_file
+        }
+        response = requests.post(KYC_SERVICE_URL, files=files, timeout=90)
+    except requests.RequestException as e:
+        raise KYCServiceError(str(e)) from e
+
+    if response.status_code >= 500:
+        raise KYCServiceError(f"KYC service returned {response.status_code}")
+    if response.status_code != 200:
+        # 4xx: the service rejected the images (no face found, bad file)
+        return False
+    return response.json().get("is_match", False)
+
+
+KYC_MESSAGES = {
+    'VERIFIED': "AI Verification successful! Your profile is now under final review by our team.",
+    'FAILED': "Face verification failed. Please ensure your selfie matches your NID and try again.",
+    'ERROR': "We could not verify your selfie right now. Please try again later.",
+}
+
+
+def expire_stale_kyc(verifications):
+    """Marks PENDING/PROCESSING verifications older than KYC_VERIFICATION_TIMEOUT as ERROR."""
+    now = timezone.now()
+    verifications.filter(
+        status__in=['PENDING', 'PROCESSING'],
+        created_at__lt=now - timedelta(seconds=settings.KYC_VERIFICATION_TIMEOUT),
+    ).update(status='ERROR', error='Verification timed out', completed_at=now)
+
+
+def complete_kyc(verification, status, error=''):
+    """Stores the verdict, flags the profile and tells the driver (Notification + WebSocket)."""
+    verification.status = status
+    verification.error = error
+    verification.completed_at = timezone.now()
+    verification.save(update_fields=['status', 'error', 'completed_at'])
+
+    profile = verification.driver
+    if status == 'VERIFIED' and not profile.ai_verified:
+        profile.ai_verified = True
+        profile.save(update_fields=['ai_verified'])
+
+    Notification.objects.create(
+        title="Identity Verification",
+        message=KYC_MESSAGES[status],
+        user=profile.user
+    )
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            driver_group(profile.user_id),
+            {
+                "type": "kyc_update",
+                "data": {
+                    "event": "KYC_RESULT",
+                    "verification_id": verification.id,
+                    "status": status,
+                    "message": KYC_MESSAGES[status],
+                }
+            }
+        )
+    except Exception as e:
+        # The driver can still poll the status endpoint
+        logger.warning(f"Could not push KYC result {verification.id}: {e}")
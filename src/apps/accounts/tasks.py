@@ -0,0 +1,31 @@
+from celery import shared_task
+
+from src.apps.accounts.models import KYCVerification
+from src.apps.accounts.services import KYCServiceError, complete_kyc, verify_image_ai
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=15)
+def task_verify_kyc(self, verification_id):
+    verification = KYCVerification.objects.select_related('driver__user').filter(id=verification_id).first()
+    # ERROR also covers verifications the upload view expired as stale
+    if not verification or verification.status in ('VERIFIED', 'FAILED', 'ERROR'):
+        return
+
+    if verification.status != 'PROCESSING':
+        verification.status = 'PROCESSING'
+        verification.save(update_fields=['status'])
+
+    try:
+        with verification.selfie.open('rb') as selfie, verification.driver.nid_front.open('rb') as nid:
+            is_match = verify_image_ai(selfie, nid)
+    except KYCServiceError as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        complete_kyc(verification, 'ERROR', str(e))
+        return
+    except OSError as e:
+        # Selfie or NID file missing from storage
+        complete_kyc(verification, 'ERROR', str(e))
+        return
+
+    complete_kyc(verification, 'VERIFIED' if is_match else 'FAILED')
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class DashboardConfig(AppConfig):
     name = 'src.apps.dashboard'
+
+    def ready(self):
+        import src.apps.dashboard.signals
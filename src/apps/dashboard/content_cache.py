@@ -0,0 +1,41 @@
+"""
+Cache of the rendered terms / privacy / about-us payloads.
+
+Entries live in the 'static' cache alias. Each stores the serialized data
+with its ETag and Last-Modified time, so a warm GET never reaches the
+database. Entries have no expiry; saving or deleting the row (PATCH
+endpoint or Django admin) drops the entry through the signals in
+dashboard.signals.
+"""
+import hashlib
+import json
+
+from django.core.cache import caches
+from django.utils import timezone
+
+CACHE_KEY = "static_content:{}"
+
+
+def _key(model):
+    return CACHE_KEY.format(model._meta.model_name)
+
+
+def get_payload(model, serializer_class):
+    """Returns {'data', 'etag', 'last_modified'} for the singleton row."""
+    key = _key(model)
+    payload = caches['static'].get(key)
+    if payload is None:
+        obj, _ = model.objects.get_or_create(id=1)
+        data = dict(serializer_class(obj).data)
+        body = json.dumps(data, sort_keys=True, default=str).encode()
+        payload = {
+            'data': data,
+            'etag': hashlib.md5(body).hexdigest(),
+            'last_modified': (obj.updated_at or timezone.now()).timestamp(),
+        }
+        caches['static'].set(key, payload, timeout=None)
+    return payload
+
+
+def invalidate(model):
+    caches['static'].delete(_key(model))
@@ -0,0 +1,18 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Prints cache hit/miss counts and hit ratio per cache alias (summed over all processes)"
+
+    def handle(self, *args, **options):
+        metrics = caches['default'].metrics()
+        if not metrics:
+            self.stdout.write("No cache metrics recorded yet")
+            return
+        for prefix, counts in sorted(metrics.items()):
+            total = counts['hits'] + counts['misses']
+            ratio = counts['hits'] / total if total else 0
+            self.stdout.write(
+                f"{prefix:<8} hits {counts['hits']:>10}  misses {counts['misses']:>10}  hit ratio {ratio:.1%}"
+            )
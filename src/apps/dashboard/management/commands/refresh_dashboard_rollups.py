@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from src.apps.dashboard.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Refreshes the admin dashboard revenue/signup rollups (use --full to backfill all history)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every day")
+        parser.add_argument('--since', type=date.fromisoformat, help="Recompute days on/after YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        since = refresh_rollups(since=options['since'], full=options['full'])
+        scope = f"since {since}" if since else "for all history"
+        self.stdout.write(self.style.SUCCESS(f"Dashboard rollups refreshed {scope}"))
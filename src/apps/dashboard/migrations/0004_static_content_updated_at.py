@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_dailyrevenue_dailysignups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutus',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='privacyandpolicymodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='termsandconditionsmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
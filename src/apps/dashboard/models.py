@@ -38,6 +38,7 @@ class TermsAndConditionsModel(models.Model):
         },
         sanitize=True 
     )
+    updated_at = models.DateTimeField(auto_now=True)
     
 class PrivacyAndPolicyModel(models.Model):
     content = ProseEditorField(
@@ -75,6 +76,7 @@ class PrivacyAndPolicyModel(models.Model):
         },
         sanitize=True 
     )
+    updated_at = models.DateTimeField(auto_now=True)
     
     
 class AboutUs(models.Model):
@@ -109,6 +111,7 @@ class AboutUs(models.Model):
         },
         sanitize=True 
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = 'About Us'
@@ -146,4 +149,23 @@ class Notification(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class DailyRevenue(models.Model):
+    """Successful payments per local day, refreshed by dashboard.rollups."""
+    date = models.DateField(unique=True)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transactions = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Revenue {self.date}: {self.revenue}"
+
+
+class DailySignups(models.Model):
+    """New users per local day, refreshed by dashboard.rollups."""
+    date = models.DateField(unique=True)
+    users = models.PositiveIntegerField(default=0)
+    riders = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Signups {self.date}: {self.users}"
@@ -0,0 +1,116 @@
+"""
+Daily revenue and signup rollups for the admin dashboard.
+
+A Celery beat task re-aggregates the last DASHBOARD_ROLLUP_LOOKBACK_DAYS
+local days from Transaction and User into DailyRevenue / DailySignups.
+Every write that changes a transaction's status (ride completion, Stripe
+webhooks) and every deletion of a user or a paid transaction marks the
+affected day dirty, so the next run reaches back to it however old it is.
+The lookback only covers dirty marks lost while Redis was down. When the
+tables are empty the first run backfills all history.
+AdminDashboardStatsView only reads the rollups, so its cost grows with the
+number of days, not rows.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from src.apps.accounts.models import User
+from src.apps.payments.models import Transaction
+from .models import DailyRevenue, DailySignups
+
+logger = logging.getLogger(__name__)
+
+DIRTY_DAYS_KEY = "dashboard:rollups:dirty"
+
+
+def mark_dirty(day):
+    """Queues an older day for recomputation by the next refresh."""
+    try:
+        get_redis().zadd(DIRTY_DAYS_KEY, {day.isoformat(): day.toordinal()})
+    except RedisError as e:
+        logger.warning(f"Could not mark rollup day {day} dirty: {e}")
+
+
+def mark_transaction_dirty(txn):
+    """Queues the day a transaction is counted under, once its status change commits."""
+    day = timezone.localdate(txn.created_at)
+    transaction.on_commit(lambda: mark_dirty(day))
+
+
+def _dirty_days():
+    """Every day currently marked dirty, earliest first."""
+    try:
+        return [date.fromisoformat(day) for day in get_redis().zrange(DIRTY_DAYS_KEY, 0, -1)]
+    except RedisError as e:
+        logger.warning(f"Rollup dirty days unavailable: {e}")
+        return []
+
+
+def _clear_dirty(days):
+    # Only the days this refresh read; days marked while it ran stay queued
+    try:
+        get_redis().zrem(DIRTY_DAYS_KEY, *[day.isoformat() for day in days])
+    except RedisError as e:
+        logger.warning(f"Could not clear rollup dirty days: {e}")
+
+
+def _upsert(model, since, rows, fields):
+    with transaction.atomic():
+        stale = model.objects.all()
+        if since is not None:
+            stale = stale.filter(date__gte=since)
+        stale.exclude(date__in=[row.date for row in rows]).delete()
+        model.objects.bulk_create(rows, update_conflicts=True, unique_fields=['date'], update_fields=fields)
+
+
+def refresh_rollups(since=None, full=False):
+    """
+    Recomputes the rollup rows for local days on/after `since` (default: the
+    lookback window, or everything on the first run). Returns `since` used.
+    """
+    dirty = []
+    if full:
+        since = None
+    elif since is None and (DailyRevenue.objects.exists() or DailySignups.objects.exists()):
+        since = timezone.localdate() - timedelta(days=settings.DASHBOARD_ROLLUP_LOOKBACK_DAYS)
+        dirty = _dirty_days()
+        if dirty and dirty[0] < since:
+            since = dirty[0]
+
+    transactions = Transaction.objects.filter(status='SUCCESS')
+    users = User.objects.all()
+    if since is not None:
+        start = timezone.make_aware(datetime.combine(since, time.min))
+        transactions = transactions.filter(created_at__gte=start)
+        users = users.filter(date_joined__gte=start)
+
+    revenue = (
+        transactions.annotate(day=TruncDate('created_at')).values('day')
+        .annotate(revenue=Sum('amount'), transactions=Count('id'))
+    )
+    _upsert(DailyRevenue, since, [
+        DailyRevenue(date=row['day'], revenue=row['revenue'], transactions=row['transactions'])
+        for row in revenue
+    ], ['revenue', 'transactions'])
+
+    signups = (
+        users.annotate(day=TruncDate('date_joined')).values('day')
+        .annotate(users=Count('user_id'), riders=Count('user_id', filter=Q(is_rider=True)))
+    )
+    _upsert(DailySignups, since, [
+        DailySignups(date=row['day'], users=row['users'], riders=row['riders'])
+        for row in signups
+    ], ['users', 'riders'])
+
+    # Only now that both tables are written; a failed refresh keeps them queued
+    if dirty:
+        _clear_dirty(dirty)
+    return since
@@ -0,0 +1,73 @@
+"""
+In-process cache of every PriceConfig row.
+
+Each worker keeps a snapshot of the table plus the version number it was
+loaded at. Admin edits bump a shared version counter in Redis; workers
+compare against it at most once per PRICE_CONFIG_RECHECK_INTERVAL seconds
+and reload the (tiny) table when it moved, so fare computation does not
+query the database on the hot path.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from .models import PriceConfig
+
+logger = logging.getLogger(__name__)
+
+PRICE_CONFIG_VERSION_KEY = "price_config:version"
+
+_lock = threading.Lock()
+_state = {'version': None, 'checked_at': None, 'configs': None}
+
+
+def _shared_version():
+    try:
+        return get_redis().get(PRICE_CONFIG_VERSION_KEY) or '0'
+    except RedisError as e:
+        logger.warning(f"Price config version unavailable: {e}")
+        return None
+
+
+def _snapshot():
+    now = time.monotonic()
+    # invalidate_price_configs may clear the state between these reads; a
+    # missing snapshot always goes the locked path below
+    checked_at = _state['checked_at']
+    configs = _state['configs']
+    if configs is not None and checked_at is not None and now - checked_at < settings.PRICE_CONFIG_RECHECK_INTERVAL:
+        return configs
+
+    with _lock:
+        configs = _state['configs']
+        if configs is not None and _state['checked_at'] is not checked_at:
+            # Another thread refreshed while we waited for the lock
+            return configs
+        version = _shared_version()
+        # Without Redis we cannot tell if it changed, so reload on every recheck
+        if configs is None or version is None or version != _state['version']:
+            configs = {c.vehicle_type: c for c in PriceConfig.objects.all()}
+            _state['configs'] = configs
+            _state['version'] = version
+        _state['checked_at'] = now
+        return configs
+
+
+def get_price_config(vehicle_type):
+    """Returns the cached PriceConfig for a vehicle type, or None."""
+    return _snapshot().get(vehicle_type)
+
+
+def invalidate_price_configs():
+    """Drops this worker's snapshot and tells every other worker to reload."""
+    with _lock:
+        _state['configs'] = None
+        _state['checked_at'] = None
+    try:
+        get_redis().incr(PRICE_CONFIG_VERSION_KEY)
+    except RedisError as e:
+        logger.warning(f"Could not publish price config change: {e}")
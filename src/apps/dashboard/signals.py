@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from src.apps.accounts.models import User
+from src.apps.payments.models import Transaction
+from .models import PriceConfig, TermsAndConditionsModel, PrivacyAndPolicyModel, AboutUs
+from . import content_cache
+from .rollups import mark_dirty
+from .services import invalidate_price_configs
+
+@receiver(post_save, sender=PriceConfig)
+@receiver(post_delete, sender=PriceConfig)
+def price_config_changed(sender, instance, **kwargs):
+    # Wait for the commit so other workers never reload the old rows
+    transaction.on_commit(invalidate_price_configs)
+
+
+@receiver(post_save, sender=TermsAndConditionsModel)
+@receiver(post_save, sender=PrivacyAndPolicyModel)
+@receiver(post_save, sender=AboutUs)
+@receiver(post_delete, sender=TermsAndConditionsModel)
+@receiver(post_delete, sender=PrivacyAndPolicyModel)
+@receiver(post_delete, sender=AboutUs)
+def static_content_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: content_cache.invalidate(sender))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    day = timezone.localdate(instance.date_joined)
+    transaction.on_commit(lambda: mark_dirty(day))
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    if instance.status == 'SUCCESS':
+        day = timezone.localdate(instance.created_at)
+        transaction.on_commit(lambda: mark_dirty(day))
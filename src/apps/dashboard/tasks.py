@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from src.apps.dashboard.rollups import refresh_rollups
+
+
+@shared_task
+def refresh_dashboard_rollups():
+    since = refresh_rollups()
+    return since.isoformat() if since else None
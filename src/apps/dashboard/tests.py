@@ -1,3 +1,71 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from . import services
+
+
+class InterleavedState(dict):
+    """Runs `hook` once, right after `key` is first read: between two of _snapshot's reads."""
+
+    def __init__(self, state, key, hook):
+        super().__init__(state)
+        self.key, self.hook = key, hook
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key == self.key and self.hook:
+            hook, self.hook = self.hook, None
+            hook()
+        return value
+
+
+class PriceConfigSnapshotTests(SimpleTestCase):
+    """get_price_config must never serve a missing or stale snapshot around an invalidation."""
+
+    def setUp(self):
+        self.rows = self.make_rows()
+        self.version = '1'
+        patches = [
+            mock.patch.object(services, 'PriceConfig', SimpleNamespace(objects=SimpleNamespace(all=lambda: self.rows))),
+            mock.patch.object(services, '_shared_version', side_effect=lambda: self.version),
+            mock.patch.object(services, 'get_redis'),
+            mock.patch.object(services, '_state', {'version': None, 'checked_at': None, 'configs': None}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def make_rows(self):
+        return [SimpleNamespace(vehicle_type=v) for v in ('ECONOMY', 'XL', 'PREMIUM')]
+
+    def admin_edit(self):
+        # What an admin save does: new rows, then the version bump
+        self.rows = self.make_rows()
+        self.version = str(int(self.version) + 1)
+        services.invalidate_price_configs()
+
+    @override_settings(PRICE_CONFIG_RECHECK_INTERVAL=60)
+    def test_invalidate_between_unlocked_reads(self):
+        services.get_price_config('ECONOMY')
+        # The edit lands after the fast path read checked_at but before it
+        # reads configs
+        services._state = InterleavedState(services._state, 'checked_at', self.admin_edit)
+
+        self.assertIs(services.get_price_config('ECONOMY'), self.rows[0])
+
+    @override_settings(PRICE_CONFIG_RECHECK_INTERVAL=0)
+    def test_version_bump_during_reload(self):
+        load = services.PriceConfig.objects.all
+
+        def load_then_bump():
+            # Another worker's edit commits after our version read and row load
+            rows = load()
+            self.rows, self.version = self.make_rows(), '2'
+            return rows
+
+        with mock.patch.object(services.PriceConfig.objects, 'all', side_effect=load_then_bump):
+            services.get_price_config('ECONOMY')
+
+        self.assertIs(services.get_price_config('ECONOMY'), self.rows[0])
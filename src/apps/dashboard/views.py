@@ -4,7 +4,10 @@ from src.apps.payments.models import Transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics
-from .models import TermsAndConditionsModel, PrivacyAndPolicyModel, AboutUs, HelpSupport, PriceConfig, Notification
+from .models import (
+    TermsAndConditionsModel, PrivacyAndPolicyModel, AboutUs, HelpSupport, PriceConfig, Notification,
+    DailyRevenue, DailySignups
+)
 from .serializers import (
     TermsSerializer, PrivacySerializer, AboutUsSerializer, HelpSupportSerializer, 
     PriceConfigSerializer, NotificationSerializer, AdminUserListSerializer, 
@@ -14,7 +17,15 @@ from .serializers import (
 from src.apps.accounts.models import DriverProfile, User, PendingDriverUpdate
 from src.apps.accounts.serializers_driver import DriverProfileSerializer
 from src.apps.accounts.services import SupportService
+from src.apps.drivers.queries import online_seconds
 from src.apps.riders.models import Ride
+from src.apps.riders.utils import quote_fares_bulk, VEHICLE_TYPES
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from . import content_cache
+from src._config.pagination import CreatedAtCursorPagination, DateJoinedCursorPagination, IdCursorPagination
 
 class StaticContentBaseView(APIView):
     """Base View to handle Singleton-like behavior for static content"""
@@ -31,9 +42,18 @@ class StaticContentBaseView(APIView):
         return obj
 
     def get(self, request):
-        obj = self.get_object()
-        serializer = self.serializer_class(obj)
-        return Response(serializer.data)
+        # Served from the cache; 304 when the client's copy is current
+        payload = content_cache.get_payload(self.model, self.serializer_class)
+        etag = quote_etag(payload['etag'])
+        last_modified = int(payload['last_modified'])
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = Response(payload['data'])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
 
     def patch(self, request):
         obj = self.get_object()
@@ -84,48 +104,59 @@ class AdminDashboardStatsView(APIView):
 
     def get(self, request):
         year = request.query_params.get('year')
-        
-        # 1. Totals
-        total_revenue = Transaction.objects.filter(status='SUCCESS').aggregate(Sum('amount'))['amount__sum'] or 0
-        total_users = User.objects.filter(is_rider=True).count()
+        cache_key = f"admin_dashboard:{year or 'all'}"
+        data = caches['stats'].get(cache_key)
+        if data is None:
+            data = self.build_stats(year)
+            caches['stats'].set(cache_key, data)
+        return Response(data)
+
+    def build_stats(self, year):
+        # 1. Totals (revenue and signups come from the daily rollups)
+        total_revenue = DailyRevenue.objects.aggregate(Sum('revenue'))['revenue__sum'] or 0
+        total_users = DailySignups.objects.aggregate(Sum('riders'))['riders__sum'] or 0
         total_drivers = DriverProfile.objects.filter(admin_verified=True).count()
         new_driver_requests = DriverProfile.objects.filter(admin_verified=False).count()
+        # Same helper the driver stats are rebuilt from, so the numbers agree
+        driver_online_hours = round(online_seconds() / 3600, 1)
 
         # 2. Growth (User) - Group by Month
-        user_growth_qs = User.objects.all()
+        user_growth_qs = DailySignups.objects.all()
         if year:
-            user_growth_qs = user_growth_qs.filter(date_joined__year=year)
-            
+            user_growth_qs = user_growth_qs.filter(date__year=year)
+
         user_growth = user_growth_qs.annotate(
-            month=TruncMonth('date_joined')
-        ).values('month').annotate(count=Count('user_id')).order_by('month')
+            month=TruncMonth('date')
+        ).values('month').annotate(count=Sum('users')).order_by('month')
 
         # 3. Growth (Revenue) - Group by Month
-        revenue_growth_qs = Transaction.objects.filter(status='SUCCESS')
+        revenue_growth_qs = DailyRevenue.objects.all()
         if year:
-            revenue_growth_qs = revenue_growth_qs.filter(created_at__year=year)
+            revenue_growth_qs = revenue_growth_qs.filter(date__year=year)
 
         revenue_growth = revenue_growth_qs.annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(total=Sum('amount')).order_by('month')
-        
-        return Response({
+            month=TruncMonth('date')
+        ).values('month').annotate(total=Sum('revenue')).order_by('month')
+
+        return {
             "totals": {
                 "revenue": total_revenue,
                 "users": total_users,
                 "drivers": total_drivers,
-                "new_driver_requests": new_driver_requests
+                "new_driver_requests": new_driver_requests,
+                "driver_online_hours": driver_online_hours
             },
             "growth": {
-                "users": user_growth,
-                "revenue": revenue_growth
+                "users": list(user_growth),
+                "revenue": list(revenue_growth)
             }
-        })
+        }
 
 class AdminUserListView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
     queryset = User.objects.filter(is_rider=True)
     serializer_class = AdminUserListSerializer
+    pagination_class = DateJoinedCursorPagination
 
     def get(self, request, pk=None):
         if pk:
@@ -147,8 +178,9 @@ class AdminUserListView(generics.ListAPIView):
 
 class AdminDriverListView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
-    queryset = DriverProfile.objects.all()
+    queryset = DriverProfile.objects.prefetch_related('vehicle_photos')
     serializer_class = DriverProfileSerializer
+    pagination_class = IdCursorPagination
 
     def get(self, request, pk=None):
         if pk:
@@ -205,13 +237,15 @@ class AdminDriverApprovalView(APIView):
 
 class AdminTripListView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
-    queryset = Ride.objects.all().order_by('-created_at')
+    queryset = Ride.objects.select_related('rider', 'driver')
     serializer_class = AdminRideListSerializer
+    pagination_class = CreatedAtCursorPagination
 
 class AdminTransactionListView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
-    queryset = Transaction.objects.filter(status='SUCCESS').order_by('-created_at')
+    queryset = Transaction.objects.filter(status='SUCCESS').select_related('ride__rider')
     serializer_class = AdminTransactionSerializer
+    pagination_class = CreatedAtCursorPagination
 
 class AdminNotificationListView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAdminUser]
@@ -259,6 +293,42 @@ class AdminPriceConfigView(APIView):
         except PriceConfig.DoesNotExist:
             return Response({"error": "Config not found"}, status=404)
 
+class AdminBulkFareQuoteView(APIView):
+    """
+    Prices many trips across vehicle types in one call (partner integrations,
+    pricing what-if analysis). Body:
+    {"trips": [[pickup_lat, pickup_lng, dropoff_lat, dropoff_lng], ...], "vehicle_types": [...]}
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        trips = request.data.get('trips')
+        vehicle_types = request.data.get('vehicle_types') or VEHICLE_TYPES
+
+        if not isinstance(trips, list) or not trips:
+            return Response({"error": "trips must be a non-empty list"}, status=400)
+        if len(trips) > settings.BULK_QUOTE_MAX_TRIPS:
+            return Response({"error": f"At most {settings.BULK_QUOTE_MAX_TRIPS} trips per request"}, status=400)
+        if any(not isinstance(trip, list) or len(trip) != 4 for trip in trips):
+            return Response({"error": "Each trip must be [pickup_lat, pickup_lng, dropoff_lat, dropoff_lng]"}, status=400)
+        if not isinstance(vehicle_types, list):
+            return Response({"error": f"vehicle_types must be a list of {', '.join(VEHICLE_TYPES)}"}, status=400)
+        unknown = [v_type for v_type in vehicle_types if v_type not in VEHICLE_TYPES]
+        if unknown:
+            return Response({"error": f"Unknown vehicle_types: {', '.join(map(str, unknown))}"}, status=400)
+
+        try:
+            distance_km, fares = quote_fares_bulk(trips, vehicle_types)
+        except (TypeError, ValueError):
+            return Response({"error": "Coordinates must be numbers"}, status=400)
+
+        return Response({
+            "count": len(trips),
+            "currency": "AWG",
+            "distance_km": distance_km.round(2).tolist(),
+            "estimates": {v_type: values.tolist() for v_type, values in fares.items()}
+        })
+
 class AdminReviewUpdateView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
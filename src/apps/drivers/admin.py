@@ -1,4 +1,6 @@
 from django.contrib import admin
-from .models import DriverShift
+from .models import DriverShift, DriverStats, DriverDailyStats
 
 admin.site.register(DriverShift)
+admin.site.register(DriverStats)
+admin.site.register(DriverDailyStats)
@@ -0,0 +1,156 @@
+"""
+Live spatial index of online drivers kept in Redis GEO sets.
+
+Every driver sits in one set per vehicle type plus an "ALL" set, next to a
+sorted set of last-ping timestamps so drivers that went quiet drop out.
+PostGIS stays the source of truth: reads fall back to it whenever Redis is
+unreachable, and the index is rebuilt from it after a Redis restart.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import D
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from src.apps.accounts.models import DriverProfile
+
+logger = logging.getLogger(__name__)
+
+GEO_KEY = "drivers:geo:{}"
+ALL_TYPES = "ALL"
+SEEN_KEY = "drivers:seen"      # user_id -> unix time of last ping
+TYPE_KEY = "drivers:type"      # user_id -> vehicle type
+READY_KEY = "drivers:geo:ready"
+
+
+def _geo_key(vehicle_type):
+    return GEO_KEY.format((vehicle_type or ALL_TYPES).upper())
+
+
+def add_driver(user_id, vehicle_type, lat, lng):
+    """Inserts or moves a driver in the index. Called on every location ping."""
+    vehicle_type = (vehicle_type or '').upper()
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.geoadd(_geo_key(vehicle_type), (lng, lat, user_id))
+        pipe.geoadd(_geo_key(ALL_TYPES), (lng, lat, user_id))
+        pipe.hset(TYPE_KEY, user_id, vehicle_type)
+        pipe.zadd(SEEN_KEY, {user_id: time.time()})
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Driver index update failed for {user_id}: {e}")
+
+
+def remove_driver(user_id):
+    """Drops a driver from the index (going offline)."""
+    try:
+        r = get_redis()
+        vehicle_type = r.hget(TYPE_KEY, user_id)
+        pipe = r.pipeline(transaction=False)
+        if vehicle_type:
+            pipe.zrem(_geo_key(vehicle_type), user_id)
+        pipe.zrem(_geo_key(ALL_TYPES), user_id)
+        pipe.zrem(SEEN_KEY, user_id)
+        pipe.hdel(TYPE_KEY, user_id)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Driver index removal failed for {user_id}: {e}")
+
+
+def get_position(user_id):
+    """Returns the indexed (lat, lng) of a driver, or None if unknown."""
+    try:
+        pos = get_redis().geopos(_geo_key(ALL_TYPES), user_id)[0]
+    except RedisError:
+        return None
+    if not pos:
+        return None
+    lng, lat = pos
+    return lat, lng
+
+
+def rebuild_index():
+    """Loads every active, online driver with a known location from PostGIS."""
+    r = get_redis()
+    now = time.time()
+    pipe = r.pipeline(transaction=False)
+    profiles = DriverProfile.objects.filter(
+        is_active=True, is_online=True, last_location__isnull=False
+    ).values_list('user_id', 'vehicle_type', 'last_location')
+    for user_id, vehicle_type, location in profiles.iterator():
+        vehicle_type = (vehicle_type or '').upper()
+        pipe.geoadd(_geo_key(vehicle_type), (location.x, location.y, user_id))
+        pipe.geoadd(_geo_key(ALL_TYPES), (location.x, location.y, user_id))
+        pipe.hset(TYPE_KEY, user_id, vehicle_type)
+        pipe.zadd(SEEN_KEY, {user_id: now})
+    pipe.set(READY_KEY, int(now))
+    pipe.execute()
+
+
+def _search_index(lat, lng, radius_km, vehicle_type, count):
+    r = get_redis()
+    if not r.exists(READY_KEY):
+        rebuild_index()
+
+    key = _geo_key(vehicle_type)
+    # Over-fetch a little so stale entries pruned below don't starve the result
+    hits = r.geosearch(
+        key, longitude=lng, latitude=lat, radius=radius_km, unit='km',
+        sort='ASC', count=count * 2 if count else None, withdist=True,
+    )
+    if not hits:
+        return []
+
+    ids = [user_id for user_id, _ in hits]
+    pipe = r.pipeline(transaction=False)
+    pipe.zmscore(SEEN_KEY, ids)
+    pipe.hmget(TYPE_KEY, ids)
+    seen, types = pipe.execute()
+
+    cutoff = time.time() - settings.DRIVER_LOCATION_TTL
+    results, stale = [], []
+    for (user_id, dist), last_seen, indexed_type in zip(hits, seen, types):
+        if last_seen is None or last_seen < cutoff:
+            stale.append(user_id)
+        elif vehicle_type and indexed_type != vehicle_type.upper():
+            # Driver changed vehicle type; the old set still holds them
+            r.zrem(key, user_id)
+        else:
+            results.append((user_id, dist))
+
+    if stale:
+        for user_id in stale:
+            remove_driver(user_id)
+
+    return results[:count] if count else results
+
+
+def _search_postgis(lat, lng, radius_km, vehicle_type, count):
+    point = Point(lng, lat, srid=4326)
+    qs = DriverProfile.objects.filter(
+        is_active=True,
+        is_online=True,
+        last_location__distance_lte=(point, D(km=radius_km))
+    )
+    if vehicle_type:
+        qs = qs.filter(vehicle_type__iexact=vehicle_type)
+    qs = qs.annotate(distance=Distance('last_location', point)).order_by('distance')
+    if count:
+        qs = qs[:count]
+    return [(user_id, distance.km) for user_id, distance in qs.values_list('user_id', 'distance')]
+
+
+def nearby_drivers(lat, lng, radius_km, vehicle_type=None, count=None):
+    """
+    Returns [(user_id, distance_km), ...] for online drivers within radius_km,
+    nearest first. Answers from Redis, falling back to PostGIS.
+    """
+    try:
+        return _search_index(lat, lng, radius_km, vehicle_type, count)
+    except RedisError as e:
+        logger.warning(f"Driver index unavailable, using PostGIS: {e}")
+        return _search_postgis(lat, lng, radius_km, vehicle_type, count)
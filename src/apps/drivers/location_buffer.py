@@ -0,0 +1,106 @@
+"""
+Write-behind buffer for driver location pings.
+
+Pings land in a Redis hash (one field per driver, so a driver's newer ping
+simply replaces the older one) and a periodic Celery task flushes the hash
+to DriverProfile.last_location with one bulk UPDATE per batch.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import connection
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from src.apps.accounts.models import DriverProfile
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "drivers:loc:pending"
+FLUSHING_KEY = "drivers:loc:flushing:{}"
+
+
+def push(user_id, lat, lng):
+    """Buffers a ping. Writes straight to the DB if Redis is unavailable."""
+    try:
+        get_redis().hset(PENDING_KEY, user_id, f"{lat},{lng},{time.time()}")
+    except RedisError as e:
+        logger.warning(f"Location buffer unavailable, writing through: {e}")
+        DriverProfile.objects.filter(user_id=user_id).update(
+            last_location=Point(lng, lat, srid=4326)
+        )
+
+
+def get_latest(user_id):
+    """Returns the buffered (lat, lng) of a driver that has not been flushed yet."""
+    try:
+        value = get_redis().hget(PENDING_KEY, user_id)
+    except RedisError:
+        return None
+    if not value:
+        return None
+    lat, lng, _ = value.split(',')
+    return float(lat), float(lng)
+
+
+def latest_position(driver_profile):
+    """Latest known (lat, lng): the buffer first, then the DB column."""
+    position = get_latest(driver_profile.user_id)
+    if position:
+        return position
+    if driver_profile.last_location:
+        return driver_profile.last_location.y, driver_profile.last_location.x
+    return None
+
+
+def _bulk_update(rows):
+    table = connection.ops.quote_name(DriverProfile._meta.db_table)
+    values = ", ".join(["(%s, %s::float8, %s::float8)"] * len(rows))
+    sql = (
+        f"UPDATE {table} AS dp "
+        f"SET last_location = ST_SetSRID(ST_MakePoint(v.lng, v.lat), 4326) "
+        f"FROM (VALUES {values}) AS v(user_id, lng, lat) "
+        f"WHERE dp.user_id = v.user_id"
+    )
+    params = [p for user_id, lat, lng in rows for p in (user_id, lng, lat)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def flush():
+    """
+    Moves the pending hash aside atomically and writes it to the DB in batches.
+    On failure the entries go back into the buffer unless a newer ping arrived.
+    Returns the number of driver rows written.
+    """
+    r = get_redis()
+    flushing_key = FLUSHING_KEY.format(uuid.uuid4().hex)
+    try:
+        r.rename(PENDING_KEY, flushing_key)
+    except RedisError:
+        # Nothing buffered since the last flush
+        return 0
+
+    entries = r.hgetall(flushing_key)
+    rows = []
+    for user_id, value in entries.items():
+        lat, lng, _ = value.split(',')
+        rows.append((user_id, float(lat), float(lng)))
+
+    batch_size = settings.DRIVER_LOCATION_FLUSH_BATCH_SIZE
+    try:
+        for start in range(0, len(rows), batch_size):
+            _bulk_update(rows[start:start + batch_size])
+    except Exception:
+        pipe = r.pipeline(transaction=False)
+        for user_id, value in entries.items():
+            pipe.hsetnx(PENDING_KEY, user_id, value)
+        pipe.execute()
+        raise
+    finally:
+        r.delete(flushing_key)
+
+    return len(rows)
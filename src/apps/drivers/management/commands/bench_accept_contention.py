@@ -0,0 +1,97 @@
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from src.apps.drivers.services import claim_ride
+from src.apps.riders.models import Ride
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Fires N concurrent accepts at one ride and compares the row-lock path with the conditional-update claim"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--n', type=int, default=50, help="Concurrent accepts per ride")
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--broadcast-ms', type=float, default=20,
+                            help="Simulated channel-layer send time")
+
+    def handle(self, *args, **options):
+        driver = User.objects.filter(driver_profile__isnull=False).first()
+        rider = User.objects.exclude(pk=getattr(driver, 'pk', None)).first()
+        if not driver or not rider:
+            raise CommandError("Needs at least one driver and one other user in the database")
+
+        broadcast_delay = options['broadcast_ms'] / 1000
+
+        def lock_accept(ride_id):
+            # The old AcceptRideView: broadcast while still holding the row lock
+            with transaction.atomic():
+                ride = Ride.objects.select_for_update().get(id=ride_id)
+                if ride.status != 'SEARCHING':
+                    return False
+                ride.driver = driver
+                ride.status = 'ACCEPTED'
+                ride.save()
+                time.sleep(broadcast_delay)
+                return True
+
+        def claim_accept(ride_id):
+            won = claim_ride(ride_id, driver)
+            if won:
+                transaction.on_commit(lambda: time.sleep(broadcast_delay))
+            return won
+
+        for name, accept in [("select_for_update", lock_accept), ("conditional update", claim_accept)]:
+            latencies, winners = [], 0
+            for _ in range(options['rounds']):
+                ride = Ride.objects.create(
+                    rider=rider,
+                    pickup_location=Point(-70.03, 12.52, srid=4326),
+                    dropoff_location=Point(-69.96, 12.50, srid=4326),
+                    pickup_address="bench", dropoff_address="bench",
+                    estimated_price=10,
+                )
+                round_latencies, round_winners = self._fire(accept, ride.id, options['n'])
+                latencies += round_latencies
+                winners += round_winners
+                ride.delete()
+
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            self.stdout.write(
+                f"{name:<20} p50 {statistics.median(latencies) * 1000:>7.1f} ms  "
+                f"p99 {p99 * 1000:>7.1f} ms  max {latencies[-1] * 1000:>7.1f} ms  "
+                f"winners {winners}/{options['rounds']}"
+            )
+
+    @staticmethod
+    def _fire(accept, ride_id, n):
+        barrier = threading.Barrier(n)
+        latencies, results = [], []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                barrier.wait()
+                start = time.perf_counter()
+                won = accept(ride_id)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    results.append(won)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, sum(results)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from src.apps.accounts.models import DriverProfile
+from src.apps.drivers import stats
+
+
+class Command(BaseCommand):
+    help = "Recomputes DriverStats and DriverDailyStats from rides, transactions, reviews and shifts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--driver', help="Only rebuild this driver (user id)")
+
+    def handle(self, *args, **options):
+        profiles = DriverProfile.objects.all()
+        if options['driver']:
+            profiles = profiles.filter(user_id=options['driver'])
+
+        count = 0
+        for profile in profiles.iterator():
+            stats.rebuild(profile)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {count} driver(s)"))
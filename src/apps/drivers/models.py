@@ -13,3 +13,33 @@ class DriverShift(models.Model):
         if self.end_time:
             return self.end_time - self.start_time
         return timezone.now() - self.start_time
+
+
+class DriverStats(models.Model):
+    """Running per-driver totals, maintained incrementally by drivers.stats."""
+    driver = models.OneToOneField(DriverProfile, on_delete=models.CASCADE, related_name='stats')
+    completed_trips = models.PositiveIntegerField(default=0)
+    total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    online_seconds = models.BigIntegerField(default=0)
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return 0.0
+        return round(self.rating_sum / self.rating_count, 1)
+
+
+class DriverDailyStats(models.Model):
+    """Per-driver totals for one local calendar day."""
+    driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    completed_trips = models.PositiveIntegerField(default=0)
+    earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    online_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['driver', 'date'], name='driver_daily_stats_unique'),
+        ]
@@ -0,0 +1,66 @@
+"""
+Shift-duration aggregates computed in the database.
+
+Only closed shifts count. Per-day buckets split a shift at local midnight
+(settings.TIME_ZONE), so a shift running 22:00-02:00 adds two hours to each
+day.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import DurationField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from .models import DriverShift
+
+SHIFT_DURATION = ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+
+
+def online_seconds(shifts=None):
+    """Total online seconds over a DriverShift queryset (all shifts by default)."""
+    if shifts is None:
+        shifts = DriverShift.objects.all()
+    total = shifts.filter(end_time__isnull=False).aggregate(total=Sum(SHIFT_DURATION))['total']
+    return int((total or timedelta()).total_seconds())
+
+
+ONLINE_BY_DAY_SQL = """
+    SELECT s.driver_id, day::date,
+           SUM(EXTRACT(EPOCH FROM
+               LEAST(s.end_time, (day + interval '1 day') AT TIME ZONE %(tz)s)
+               - GREATEST(s.start_time, day AT TIME ZONE %(tz)s)
+           ))::bigint
+    FROM {table} s
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('day', s.start_time AT TIME ZONE %(tz)s),
+        date_trunc('day', s.end_time AT TIME ZONE %(tz)s),
+        interval '1 day'
+    ) AS day
+    WHERE s.end_time IS NOT NULL AND s.end_time > s.start_time {filters}
+    GROUP BY s.driver_id, day
+"""
+
+
+def online_seconds_by_day(driver_ids=None, shift_ids=None, since=None):
+    """
+    Returns [(driver_profile_id, date, seconds), ...] for closed shifts,
+    optionally limited to some drivers, some shifts, or days on/after `since`.
+    """
+    filters, params = [], {'tz': timezone.get_current_timezone_name()}
+    if driver_ids is not None:
+        filters.append("AND s.driver_id = ANY(%(driver_ids)s)")
+        params['driver_ids'] = list(driver_ids)
+    if shift_ids is not None:
+        filters.append("AND s.id = ANY(%(shift_ids)s)")
+        params['shift_ids'] = list(shift_ids)
+    if since is not None:
+        filters.append("AND s.end_time >= %(since)s::timestamp AT TIME ZONE %(tz)s")
+        params['since'] = since
+
+    sql = ONLINE_BY_DAY_SQL.format(table=DriverShift._meta.db_table, filters=" ".join(filters))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if since is not None:
+        rows = [row for row in rows if row[1] >= since]
+    return rows
@@ -1,8 +1,6 @@
 from rest_framework import serializers
-from django.db.models import Avg, Sum
 from src.apps.accounts.models import DriverProfile
-from datetime import timedelta
-from django.utils import timezone
+from . import stats
 
 class DriverDashboardSerializer(serializers.ModelSerializer):
     rating = serializers.SerializerMethodField()
@@ -22,21 +20,19 @@ class DriverDashboardSerializer(serializers.ModelSerializer):
         ]
 
     def get_rating(self, obj):
-        avg = obj.user.reviews_received.aggregate(Avg('rating'))['rating__avg']
-        return round(avg, 1) if avg else 0.0
+        return self._stats(obj).average_rating
 
     def get_total_rides(self, obj):
-        return obj.user.rides_as_driver.filter(status='COMPLETED').count()
+        return self._stats(obj).completed_trips
 
     def get_this_week_rides(self, obj):
-        last_7_days = timezone.now() - timedelta(days=7)
-        return obj.user.rides_as_driver.filter(
-            status='COMPLETED', 
-            created_at__gte=last_7_days
-        ).count()
+        return stats.recent_totals(obj, 7)['trips']
 
     def get_active_hours_30_days(self, obj):
-        last_30_days = timezone.now() - timedelta(days=30)
-        shifts = obj.shifts.filter(start_time__gte=last_30_days, end_time__isnull=False)
-        total_duration = sum([s.duration for s in shifts], timedelta())
-        return f"{int(total_duration.total_seconds() // 3600)}hrs"
\ No newline at end of file
+        seconds = stats.recent_totals(obj, 30)['online_seconds']
+        return f"{int(seconds // 3600)}hrs"
+
+    def _stats(self, obj):
+        if not hasattr(self, '_driver_stats'):
+            self._driver_stats = stats.get_stats(obj)
+        return self._driver_stats
@@ -0,0 +1,126 @@
+import logging
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from src.apps.accounts.models import DriverProfile
+from src.apps.riders.models import Ride
+from src.apps.riders.distance import haversine_km
+from src.apps.riders.dispatch import driver_group
+from src.apps.riders.tasks import task_broadcast_location
+from src.apps.drivers import geo_index, location_buffer
+from src.apps.drivers.utils import broadcast_ride_update, location_update_payload
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_KEY = "ride:{}:telemetry"
+
+
+def _should_publish(ride_id, status, lat, lng):
+    """
+    Delta suppression and per-ride rate limiting. Remembers the last sent
+    position per ride in Redis so every web/WS worker shares the same view.
+    """
+    key = TELEMETRY_KEY.format(ride_id)
+    now = time.time()
+    try:
+        r = get_redis()
+        last = r.hgetall(key)
+        if last and last.get('status') == status:
+            if now - float(last['ts']) < settings.TRIP_LOCATION_MIN_INTERVAL:
+                return False
+            moved = haversine_km(float(last['lat']), float(last['lng']), lat, lng) * 1000
+            if moved < settings.TRIP_LOCATION_MIN_DISTANCE_M:
+                return False
+        pipe = r.pipeline(transaction=False)
+        pipe.hset(key, mapping={'lat': lat, 'lng': lng, 'ts': now, 'status': status})
+        pipe.expire(key, 3600)
+        pipe.execute()
+    except RedisError as e:
+        # Fail open: an extra send is better than a frozen car on the map
+        logger.warning(f"Telemetry state unavailable for ride {ride_id}: {e}")
+    return True
+
+
+def publish_trip_location(ride_id, status, lat, lng, driver_id):
+    """Single fan-out path for trip telemetry to the rider's ride_<id> group."""
+    if not _should_publish(ride_id, status, lat, lng):
+        return False
+
+    if settings.TRIP_LOCATION_FANOUT == 'celery':
+        task_broadcast_location.delay(ride_id, lat, lng, status, driver_id)
+    else:
+        broadcast_ride_update(ride_id, location_update_payload(lat, lng, status, driver_id))
+    return True
+
+
+def record_driver_location(user, driver_profile, lat, lng, go_online=True):
+    """
+    Shared ingestion path for a driver location ping, used by the REST
+    endpoint and the discovery WebSocket. With go_online=False (socket pings)
+    an offline driver's position is stored but they are not offered rides.
+    """
+    # 1. Buffer the position; a periodic task writes it to the DB in bulk
+    location_buffer.push(user.user_id, lat, lng)
+    if not driver_profile.is_online and go_online:
+        DriverProfile.objects.filter(pk=driver_profile.pk).update(is_online=True)
+        driver_profile.is_online = True
+    if driver_profile.is_online and driver_profile.is_active:
+        geo_index.add_driver(user.user_id, driver_profile.vehicle_type, lat, lng)
+
+    # 2. WebSocket Push (Hybrid Logic)
+    # Find if this driver is currently in an active trip
+    active_ride = Ride.objects.filter(
+        driver=user,
+        status__in=['ACCEPTED', 'ARRIVED', 'STARTED']
+    ).only('id', 'status').first()
+
+    if active_ride:
+        # We broadcast the update so the Rider's map shows the car moving
+        publish_trip_location(active_ride.id, active_ride.status, lat, lng, user.user_id)
+
+
+def notify_driver_status(profile):
+    """Updates the flags cached by the driver's open discovery sockets."""
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            driver_group(profile.user_id),
+            {
+                "type": "driver_status",
+                "is_online": profile.is_online,
+                "is_active": profile.is_active,
+                "vehicle_type": profile.vehicle_type,
+            }
+        )
+    except Exception as e:
+        # Sockets still pick the change up on their next periodic re-read
+        logger.warning(f"Could not notify sockets of driver {profile.user_id}: {e}")
+
+
+def claim_ride(ride_id, driver):
+    """
+    Assigns a SEARCHING ride to `driver` with a single conditional UPDATE.
+    The UPDATE locks the row, so concurrent accepts wait for the first to
+    commit; they then re-check status SEARCHING and update 0 rows. Only one
+    accept wins, and the lock is held for that one statement only. Returns
+    True if this driver won the ride.
+    """
+    return Ride.objects.filter(id=ride_id, status='SEARCHING').update(
+        driver=driver, status='ACCEPTED'
+    ) == 1
+
+
+def notify_ride_accepted(ride_id, driver):
+    """Tells the rider's ride_<id> group which driver is on the way."""
+    profile = driver.driver_profile
+    broadcast_ride_update(ride_id, {
+        "type": "DRIVER_ACCEPTED",
+        "status": "ACCEPTED",
+        "driver_name": driver.full_name,
+        "driver_phone": driver.phone_number,
+        "vehicle": f"{profile.vehicle_brand} {profile.vehicle_model}"
+    })
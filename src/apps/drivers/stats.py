@@ -0,0 +1,157 @@
+"""
+Precomputed driver statistics.
+
+DriverStats holds running totals and DriverDailyStats holds per-day rollups.
+Both are bumped with F() updates at the moment something happens: a trip
+completes, a payment succeeds, a review arrives or a shift closes. The
+dashboard and earnings endpoints then read one row plus at most 30 daily rows
+instead of re-aggregating rides, transactions, reviews and shifts.
+A driver without a DriverStats row (everyone who drove before these tables
+existed) is rebuilt from the raw tables the first time their stats are read
+or bumped. `manage.py rebuild_driver_stats` recomputes everything.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from src.apps.accounts.models import DriverProfile
+from src.apps.payments.models import Transaction
+from src.apps.riders.models import Ride, RideReview
+from .models import DriverDailyStats, DriverShift, DriverStats
+from .queries import online_seconds, online_seconds_by_day
+
+
+def _profile_id(user_id):
+    return DriverProfile.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+
+
+def _add(profile_id, day=None, totals=None, daily=None):
+    with transaction.atomic():
+        if totals:
+            DriverStats.objects.get_or_create(driver_id=profile_id)
+            DriverStats.objects.filter(driver_id=profile_id).update(
+                **{field: F(field) + value for field, value in totals.items()}
+            )
+        if daily:
+            DriverDailyStats.objects.get_or_create(driver_id=profile_id, date=day)
+            DriverDailyStats.objects.filter(driver_id=profile_id, date=day).update(
+                **{field: F(field) + value for field, value in daily.items()}
+            )
+
+
+def _backfilled(profile_id):
+    """
+    Rebuilds a driver's rows if they have none yet. The event being recorded
+    is already in the raw tables, so callers skip their increment on True.
+    """
+    if DriverStats.objects.filter(driver_id=profile_id).exists():
+        return False
+    with transaction.atomic():
+        # Serializes concurrent first events for the same driver
+        profile = DriverProfile.objects.select_for_update().get(id=profile_id)
+        if DriverStats.objects.filter(driver_id=profile_id).exists():
+            return False
+        rebuild(profile)
+    return True
+
+
+def record_trip_completed(ride):
+    profile_id = _profile_id(ride.driver_id)
+    if profile_id and not _backfilled(profile_id):
+        _add(profile_id, timezone.localdate(), totals={'completed_trips': 1}, daily={'completed_trips': 1})
+
+
+def record_payment_succeeded(txn):
+    """Call only after the transaction actually moved to SUCCESS, once."""
+    profile_id = _profile_id(txn.ride.driver_id)
+    if profile_id and not _backfilled(profile_id):
+        day = timezone.localdate(txn.created_at)
+        _add(profile_id, day, totals={'total_earnings': txn.amount}, daily={'earnings': txn.amount})
+
+
+def record_review(review):
+    profile_id = _profile_id(review.driver_id)
+    if profile_id and not _backfilled(profile_id):
+        _add(profile_id, totals={'rating_sum': int(review.rating), 'rating_count': 1})
+
+
+def record_shift_closed(shift):
+    if _backfilled(shift.driver_id):
+        return
+    total = 0
+    for _, day, seconds in online_seconds_by_day(shift_ids=[shift.id]):
+        _add(shift.driver_id, day, daily={'online_seconds': seconds})
+        total += seconds
+    if total:
+        _add(shift.driver_id, totals={'online_seconds': total})
+
+
+def get_stats(profile):
+    """The driver's totals row, rebuilt from the raw tables if they have none yet."""
+    row = DriverStats.objects.filter(driver=profile).first()
+    if row is None:
+        _backfilled(profile.id)
+        row = DriverStats.objects.get(driver=profile)
+    return row
+
+
+def recent_totals(profile, days):
+    """Trips, earnings and online seconds over the last `days` local days (today included)."""
+    _backfilled(profile.id)
+    since = timezone.localdate() - timedelta(days=days - 1)
+    totals = DriverDailyStats.objects.filter(driver=profile, date__gte=since).aggregate(
+        trips=Sum('completed_trips'), earnings=Sum('earnings'), online_seconds=Sum('online_seconds')
+    )
+    return {key: value or 0 for key, value in totals.items()}
+
+
+def daily_breakdown(profile, days):
+    _backfilled(profile.id)
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return list(
+        DriverDailyStats.objects.filter(driver=profile, date__gte=since)
+        .filter(Q(completed_trips__gt=0) | Q(earnings__gt=0))
+        .order_by('-date')
+        .values('date', 'earnings', trips=F('completed_trips'))
+    )
+
+
+def rebuild(profile):
+    """Recomputes one driver's totals and daily rows from the raw tables."""
+    user_id = profile.user_id
+    # Every completed ride gets its Transaction at completion, so its
+    # created_at dates the completion
+    trips_by_day = dict(
+        Transaction.objects.filter(ride__driver_id=user_id, ride__status='COMPLETED')
+        .annotate(day=TruncDate('created_at')).values('day')
+        .annotate(n=Count('id')).values_list('day', 'n')
+    )
+    earnings_by_day = dict(
+        Transaction.objects.filter(ride__driver_id=user_id, ride__status='COMPLETED', status='SUCCESS')
+        .annotate(day=TruncDate('created_at')).values('day')
+        .annotate(total=Sum('amount')).values_list('day', 'total')
+    )
+    online_by_day = {day: seconds for _, day, seconds in online_seconds_by_day(driver_ids=[profile.id])}
+    ratings = RideReview.objects.filter(driver_id=user_id).aggregate(total=Sum('rating'), n=Count('id'))
+
+    with transaction.atomic():
+        DriverStats.objects.update_or_create(driver=profile, defaults={
+            'completed_trips': Ride.objects.filter(driver_id=user_id, status='COMPLETED').count(),
+            'total_earnings': sum(earnings_by_day.values(), 0),
+            'rating_sum': ratings['total'] or 0,
+            'rating_count': ratings['n'],
+            'online_seconds': online_seconds(DriverShift.objects.filter(driver=profile)),
+        })
+        DriverDailyStats.objects.filter(driver=profile).delete()
+        DriverDailyStats.objects.bulk_create([
+            DriverDailyStats(
+                driver=profile, date=day,
+                completed_trips=trips_by_day.get(day, 0),
+                earnings=earnings_by_day.get(day, 0),
+                online_seconds=online_by_day.get(day, 0),
+            )
+            for day in set(trips_by_day) | set(earnings_by_day) | set(online_by_day)
+        ])
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from src.apps.drivers import location_buffer
+
+
+@shared_task
+def flush_driver_locations():
+    return location_buffer.flush()
@@ -9,4 +9,13 @@ def broadcast_ride_update(ride_id, data):
             'type': 'ride_update',
             'data': data
         }
-    )
\ No newline at end of file
+    )
+
+def location_update_payload(lat, lng, status, driver_id=None):
+    return {
+        "type": "LOCATION_UPDATE",
+        "lat": lat,
+        "lng": lng,
+        "status": status,
+        "driver_id": driver_id
+    }
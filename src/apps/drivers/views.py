@@ -2,12 +2,15 @@ from django.contrib.gis.geos import Point
 from rest_framework.views import APIView
 from rest_framework import permissions,status
 from rest_framework.response import Response
-from django.contrib.gis.measure import D,Distance
+from django.contrib.gis.measure import D
+from django.contrib.gis.db.models.functions import Distance
 from src.apps.riders.models import Ride
 from src.apps.riders.serializers import RideSerializer
-from src.apps.drivers.utils import broadcast_ride_update
-from src.apps.riders.tasks import task_broadcast_location
+from src.apps.riders.distance import radius_degrees
+from src.apps.drivers import geo_index, location_buffer, stats
+from src.apps.drivers.services import claim_ride, notify_driver_status, notify_ride_accepted, record_driver_location
 from django.db import transaction
+from src._config.pagination import CreatedAtCursorPagination
 
 from src.apps.accounts.permissions import IsDriver, IsVerifiedDriver
 from rest_framework.views import APIView
@@ -30,34 +33,8 @@ class UpdateDriverLocationView(APIView):
             return Response({"error": "Coordinates (lat, lng) required"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # 1. Update Driver's DB Profile
             driver_profile = request.user.driver_profile
-            driver_profile.last_location = Point(float(lng), float(lat), srid=4326)
-            driver_profile.is_online = True
-            driver_profile.save()
-
-            # 2. WebSocket Push (Hybrid Logic)
-            # Find if this driver is currently in an active trip
-            active_ride = Ride.objects.filter(
-                driver=request.user, 
-                status__in=['ACCEPTED', 'ARRIVED', 'STARTED']
-            ).first()
-            
-            if active_ride:
-                # We broadcast the update so the Rider's map shows the car moving
-                broadcast_ride_update(active_ride.id, {
-                    "type": "LOCATION_UPDATE",
-                    "lat": float(lat),
-                    "lng": float(lng),
-                    "status": active_ride.status,
-                    "driver_id": request.user.user_id
-                })
-                task_broadcast_location.delay(
-                    active_ride.id, 
-                    float(lat), 
-                    float(lng), 
-                    active_ride.status
-                )
+            record_driver_location(request.user, driver_profile, float(lat), float(lng))
 
             return Response({"message": "Location updated and broadcasted"})
 
@@ -73,15 +50,21 @@ class AvailableRidesView(APIView):
 
     def get(self, request):
         driver_profile = request.user.driver_profile
-        if not driver_profile.last_location:
+
+        # The DB column lags behind the location buffer by up to one flush
+        position = location_buffer.latest_position(driver_profile)
+        if not position:
             return Response({"error": "Update your location first"}, status=400)
+        location = Point(position[1], position[0], srid=4326)
 
         # Find rides within 5km of the driver's current position
-        rides = Ride.objects.filter(
+        rides = Ride.objects.with_details().filter(
             status='SEARCHING',
-            pickup_location__distance_lte=(driver_profile.last_location, D(km=5))
+            # Bounding prefilter on the partial GiST index, then the exact distance
+            pickup_location__dwithin=(location, radius_degrees(5, position[0])),
+            pickup_location__distance_lte=(location, D(km=5))
         ).annotate(
-            distance=Distance('pickup_location', driver_profile.last_location)
+            distance=Distance('pickup_location', location)
         ).order_by('distance')
 
         serializer = RideSerializer(rides, many=True)
@@ -92,32 +75,19 @@ class AcceptRideView(APIView):
     permission_classes = [IsVerifiedDriver]
 
     def post(self, request, ride_id):
-        with transaction.atomic():
-            # Select_for_update locks the row so no other driver can edit it right now
-            try:
-                ride = Ride.objects.select_for_update().get(id=ride_id)
-            except Ride.DoesNotExist:
+        # A conditional UPDATE claims the ride without holding a row lock
+        if not claim_ride(ride_id, request.user):
+            if not Ride.objects.filter(id=ride_id).exists():
                 return Response({"error": "Ride not found"}, status=404)
+            return Response({"error": "Ride already taken or cancelled"}, status=400)
 
-            if ride.status != 'SEARCHING':
-                return Response({"error": "Ride already taken or cancelled"}, status=400)
-
-            # Assign driver and change status
-            ride.driver = request.user
-            ride.status = 'ACCEPTED'
-            ride.save()
-            broadcast_ride_update(ride.id, {
-                "type": "DRIVER_ACCEPTED",
-                "status": "ACCEPTED",
-                "driver_name": request.user.full_name,
-                "driver_phone": request.user.phone_number,
-                "vehicle": f"{request.user.driver_profile.vehicle_brand} {request.user.driver_profile.vehicle_model}"
-            })
-            return Response({
-                "message": "Ride accepted successfully",
-                "ride_id": ride.id
-            })
-        
+        # Broadcast only once the claim is committed
+        driver = request.user
+        transaction.on_commit(lambda: notify_ride_accepted(ride_id, driver))
+        return Response({
+            "message": "Ride accepted successfully",
+            "ride_id": ride_id
+        })
 
 
 
@@ -170,6 +140,9 @@ class DriverToggleOnlineView(APIView):
             # Logic: Start a new shift
             # We use update_or_create/last check to prevent double shifts if the app crashed
             DriverShift.objects.create(driver=profile, start_time=timezone.now())
+            position = location_buffer.latest_position(profile)
+            if position and profile.is_active:
+                geo_index.add_driver(user.user_id, profile.vehicle_type, *position)
             message = "You are now Online and searching for rides."
         else:
             # Logic: End the current open shift
@@ -177,9 +150,12 @@ class DriverToggleOnlineView(APIView):
             if current_shift:
                 current_shift.end_time = timezone.now()
                 current_shift.save()
+                stats.record_shift_closed(current_shift)
+            geo_index.remove_driver(user.user_id)
             message = "You are now Offline."
 
         profile.save()
+        transaction.on_commit(lambda: notify_driver_status(profile))
 
         return Response({
             "is_online": profile.is_online,
@@ -198,72 +174,25 @@ class DriverEarningsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from django.db.models import Sum, Count
-        from django.db.models.functions import TruncDate
-        from src.apps.payments.models import Transaction
-        from datetime import timedelta
-        
         try:
             profile = request.user.driver_profile
         except DriverProfile.DoesNotExist:
             return Response({"error": "Driver profile not found"}, status=404)
 
-        # 1. Total Earnings (All Time)
-        completed_rides = Ride.objects.filter(driver=request.user, status='COMPLETED')
-        total_earnings = Transaction.objects.filter(
-            ride__in=completed_rides,
-            status='SUCCESS'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-        # 2. Total Trips
-        total_trips = completed_rides.count()
-
-        # 3. Online Time (Total from all shifts)
-        total_online_seconds = sum(
-            [shift.duration.total_seconds() for shift in profile.shifts.filter(end_time__isnull=False)],
-            0
-        )
-        total_online_hours = round(total_online_seconds / 3600, 1)
-
-        # 4. Average Rating
-        from django.db.models import Avg
-        from src.apps.riders.models import RideReview
-        avg_rating = RideReview.objects.filter(driver=request.user).aggregate(Avg('rating'))['rating__avg']
-        avg_rating = round(avg_rating, 1) if avg_rating else 0.0
-
-        # 5. Date-wise Earnings (Last 30 days)
-        last_30_days = timezone.now() - timedelta(days=30)
-        daily_earnings = Transaction.objects.filter(
-            ride__driver=request.user,
-            ride__status='COMPLETED',
-            status='SUCCESS',
-            created_at__gte=last_30_days
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            earnings=Sum('amount'),
-            trips=Count('id')
-        ).order_by('-date')
-
-        # 6. This Week's Earnings
-        last_7_days = timezone.now() - timedelta(days=7)
-        this_week_earnings = Transaction.objects.filter(
-            ride__driver=request.user,
-            ride__status='COMPLETED',
-            status='SUCCESS',
-            created_at__gte=last_7_days
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
+        # Totals and daily rollups are maintained by drivers.stats
+        totals = stats.get_stats(profile)
+        this_week = stats.recent_totals(profile, 7)
 
         return Response({
             "summary": {
-                "total_earnings": str(total_earnings),
-                "this_week_earnings": str(this_week_earnings),
-                "total_trips": total_trips,
-                "total_online_hours": total_online_hours,
-                "average_rating": avg_rating,
+                "total_earnings": str(totals.total_earnings),
+                "this_week_earnings": str(this_week['earnings']),
+                "total_trips": totals.completed_trips,
+                "total_online_hours": round(totals.online_seconds / 3600, 1),
+                "average_rating": totals.average_rating,
                 "currency": "AWG"
             },
-            "daily_breakdown": list(daily_earnings)
+            "daily_breakdown": stats.daily_breakdown(profile, 30)
         })
 
 
@@ -274,12 +203,12 @@ class DriverTripHistoryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        rides = Ride.objects.filter(
-            driver=request.user
-        ).select_related('rider').order_by('-created_at')
-        
+        rides = Ride.objects.with_details().filter(driver=request.user)
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(rides, request, view=self)
+
         history = []
-        for ride in rides:
+        for ride in page:
             ride_data = RideSerializer(ride).data
             # Add rating if exists
             if hasattr(ride, 'review'):
@@ -289,5 +218,5 @@ class DriverTripHistoryView(APIView):
                 ride_data['rating'] = None
                 ride_data['review_comment'] = None
             history.append(ride_data)
-        
-        return Response(history)
\ No newline at end of file
+
+        return paginator.get_paginated_response(history)
\ No newline at end of file
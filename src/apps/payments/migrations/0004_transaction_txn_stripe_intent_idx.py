@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_transaction_txn_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['stripe_payment_intent_id'], name='txn_stripe_intent_idx'),
+        ),
+    ]
@@ -12,5 +12,12 @@ class Transaction(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-created_at', '-id'], name='txn_status_created_idx'),
+            # Stripe webhooks look transactions up by session / intent id
+            models.Index(fields=['stripe_payment_intent_id'], name='txn_stripe_intent_idx'),
+        ]
+
     def __str__(self):
         return f"Payment for Ride {self.ride.id} - {self.status}"
\ No newline at end of file
@@ -3,10 +3,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
+from django.db import transaction as db_transaction
 from src.apps.riders.models import Ride
 from src.apps.payments.services import process_ride_payment, create_stripe_ephemeral_key, create_payment_intent
 from src.apps.payments.models import Transaction
 from src.apps.drivers.utils import broadcast_ride_update
+from src.apps.drivers.stats import record_payment_succeeded, record_trip_completed
+from src.apps.dashboard.rollups import mark_transaction_dirty
 
 
 class StripeConfigView(APIView):
@@ -59,14 +62,26 @@ class UpdateRideStatusView(APIView):
         ride.status = new_status
         
         if new_status == 'COMPLETED':
+            with db_transaction.atomic():
+                # Conditional transition so a retried COMPLETED post is only
+                # charged and counted once
+                completed = Ride.objects.filter(id=ride.id, driver=request.user).exclude(
+                    status='COMPLETED'
+                ).update(status='COMPLETED')
+                if not completed:
+                    return Response({"message": "Ride already completed"})
+
+                txn = Transaction.objects.create(ride=ride, amount=ride.estimated_price, status='PENDING')
+                record_trip_completed(ride)
+
+            # The Stripe call runs after the commit, so it holds no row lock
+            # and a Stripe failure cannot undo the completion
             session_id, session_url, pay_status = process_ride_payment(ride)
-            
-            Transaction.objects.create(
-                ride=ride, 
-                amount=ride.estimated_price, 
+            Transaction.objects.filter(pk=txn.pk).update(
                 status=pay_status,
                 stripe_payment_intent_id=session_id if session_id else '' # Using session_id as the ref for now
             )
+            mark_transaction_dirty(txn)
             
             broadcast_ride_update(ride.id, {
                 "type": "TRIP_COMPLETED",
@@ -79,8 +94,8 @@ class UpdateRideStatusView(APIView):
                 "type": "STATUS_UPDATE",
                 "status": new_status
             })
+            ride.save()
 
-        ride.save()
         return Response({"message": "Status updated"})
 
 
@@ -111,8 +126,11 @@ class StripeWebhookView(APIView):
         # We stored session_id in stripe_payment_intent_id field
         transaction = Transaction.objects.filter(stripe_payment_intent_id=session['id']).first()
         if transaction:
+            # Conditional transition so webhook retries are only counted once
+            if Transaction.objects.filter(pk=transaction.pk).exclude(status='SUCCESS').update(status='SUCCESS'):
+                record_payment_succeeded(transaction)
+                mark_transaction_dirty(transaction)
             transaction.status = 'SUCCESS'
-            transaction.save()
             
             if transaction.ride:
                 broadcast_ride_update(transaction.ride.id, {
@@ -123,8 +141,11 @@ class StripeWebhookView(APIView):
     def handle_payment_success(self, intent):
         transaction = Transaction.objects.filter(stripe_payment_intent_id=intent['id']).first()
         if transaction:
+            # Conditional transition so webhook retries are only counted once
+            if Transaction.objects.filter(pk=transaction.pk).exclude(status='SUCCESS').update(status='SUCCESS'):
+                record_payment_succeeded(transaction)
+                mark_transaction_dirty(transaction)
             transaction.status = 'SUCCESS'
-            transaction.save()
             
             if transaction.ride:
                 broadcast_ride_update(transaction.ride.id, {
@@ -137,6 +158,7 @@ class StripeWebhookView(APIView):
         if transaction:
             transaction.status = 'FAILED'
             transaction.save()
+            mark_transaction_dirty(transaction)
             
             if transaction.ride:
                 broadcast_ride_update(transaction.ride.id, {
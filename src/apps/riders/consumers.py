@@ -1,14 +1,45 @@
 import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from .models import RideMessage
 from src.apps.riders.models import Ride
+from src.apps.accounts.models import DriverProfile
+from src.apps.drivers.services import record_driver_location
+from src.apps.riders.dispatch import driver_group
 from urllib.parse import parse_qs
 User = get_user_model()
 
+
+async def get_user_from_scope(scope):
+    """
+    Resolves the JWT sent in the Authorization header (or a `token` query
+    param for clients that cannot set headers). Returns None if missing/invalid.
+    """
+    token = None
+    for header in scope.get("headers", []):
+        if header[0] == b"authorization":
+            token = header[1].decode().split(" ")[-1]
+            break
+
+    if not token:
+        query_params = parse_qs(scope.get("query_string", b"").decode("utf-8"))
+        token = query_params.get("token", [None])[0]
+
+    if not token:
+        return None
+
+    try:
+        validated = UntypedToken(token)
+        user_id = validated.payload.get("user_id")
+        return await database_sync_to_async(User.objects.get)(user_id=user_id)
+    except (InvalidToken, TokenError, User.DoesNotExist):
+        return None
+
 class TripTrackingConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.ride_id = self.scope['url_route']['kwargs']['ride_id']
@@ -34,21 +65,8 @@ class TripTrackingConsumer(AsyncWebsocketConsumer):
 class RideChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         # 1. JWT Authentication (Your header logic)
-        token = None
-        for header in self.scope.get("headers", []):
-            if header[0] == b"authorization":
-                token = header[1].decode().split(" ")[-1]
-                break
-
-        if not token:
-            await self.close()
-            return
-
-        try:
-            validated = UntypedToken(token)
-            user_id = validated.payload.get("user_id")
-            self.user = await database_sync_to_async(User.objects.get)(user_id=user_id)
-        except (InvalidToken, TokenError, User.DoesNotExist):
+        self.user = await get_user_from_scope(self.scope)
+        if not self.user:
             await self.close()
             return
 
@@ -115,14 +133,26 @@ class DriverDiscoveryConsumer(AsyncWebsocketConsumer):
         # Default to ECONOMY if not provided
         self.vehicle_type = query_params.get("vehicle_type", ["ECONOMY"])[0].upper()
         
-        # 2. Define group names
+        # 2. Authenticated drivers may also stream their location over this socket
+        self.user = await get_user_from_scope(self.scope)
+        self.driver_profile = None
+        if self.user and self.user.is_driver:
+            self.driver_profile = await self.get_driver_profile(self.user)
+        self.profile_checked_at = time.monotonic()
+
+        # 3. Define group names
         self.general_group = "drivers_discovery"
         self.type_group = f"drivers_{self.vehicle_type}"
 
-        # 3. Join BOTH groups (General for broadcasts, Type-specific for ride requests)
+        # 4. Join BOTH groups (General for broadcasts, Type-specific for ride requests)
         await self.channel_layer.group_add(self.general_group, self.channel_name)
         await self.channel_layer.group_add(self.type_group, self.channel_name)
 
+        # 5. Authenticated drivers also get a personal group for targeted ride offers
+        self.driver_group = driver_group(self.user.user_id) if self.driver_profile else None
+        if self.driver_group:
+            await self.channel_layer.group_add(self.driver_group, self.channel_name)
+
         await self.accept()
         
         # Confirm connection to the driver
@@ -135,10 +165,17 @@ class DriverDiscoveryConsumer(AsyncWebsocketConsumer):
         # Leave groups on disconnect
         await self.channel_layer.group_discard(self.general_group, self.channel_name)
         await self.channel_layer.group_discard(self.type_group, self.channel_name)
+        if self.driver_group:
+            await self.channel_layer.group_discard(self.driver_group, self.channel_name)
 
     async def receive(self, text_data):
         """ Handles messages sent FROM the driver (like location updates) """
         data = json.loads(text_data)
+
+        # Location frame: {"type": "LOCATION_UPDATE", "lat": 12.5, "lng": -70.0}
+        if data.get("type") == "LOCATION_UPDATE":
+            await self.handle_location_update(data)
+            return
         
         # Example: If driver sends a message, broadcast it to the whole discovery group
         await self.channel_layer.group_send(
@@ -149,15 +186,74 @@ class DriverDiscoveryConsumer(AsyncWebsocketConsumer):
             }
         )
 
+    async def handle_location_update(self, data):
+        if not self.driver_profile:
+            await self.send(text_data=json.dumps({
+                "type": "ERROR",
+                "error": "Only authenticated drivers can send location updates"
+            }))
+            return
+
+        try:
+            lat = float(data["lat"])
+            lng = float(data["lng"])
+        except (KeyError, TypeError, ValueError):
+            await self.send(text_data=json.dumps({
+                "type": "ERROR",
+                "error": "Coordinates (lat, lng) required"
+            }))
+            return
+
+        # The cached flags may be stale (toggled offline elsewhere, deactivated
+        # by an admin), so re-read them every few seconds
+        if time.monotonic() - self.profile_checked_at >= settings.DRIVER_SOCKET_PROFILE_REFRESH:
+            await self.refresh_driver_profile()
+            if not self.driver_profile:
+                return
+
+        await database_sync_to_async(record_driver_location)(
+            self.user, self.driver_profile, lat, lng, go_online=False
+        )
+
     async def broadcast_message(self, event):
         await self.send(text_data=event["message"])
 
     async def new_ride_available(self, event):
         """ 
-        This is triggered by the CreateRideView. 
-        It sends the ride details only to drivers in the matching vehicle group.
+        This is triggered by the ride dispatcher.
+        It sends the ride details only to the drivers picked for the current wave.
         """
         await self.send(text_data=json.dumps({
             "type": "NEW_RIDE_REQUEST",
             "data": event["data"]
         }))
+
+    async def kyc_update(self, event):
+        """Pushes the verdict of a queued selfie verification to its driver."""
+        await self.send(text_data=json.dumps({
+            "type": "KYC_RESULT",
+            "data": event["data"]
+        }))
+
+    async def driver_status(self, event):
+        """Sent when the driver goes online/offline over REST."""
+        if self.driver_profile:
+            for field in ("is_online", "is_active", "vehicle_type"):
+                setattr(self.driver_profile, field, event[field])
+            self.profile_checked_at = time.monotonic()
+
+    async def refresh_driver_profile(self):
+        state = await database_sync_to_async(
+            DriverProfile.objects.filter(pk=self.driver_profile.pk)
+            .values("is_online", "is_active", "vehicle_type").first
+        )()
+        if state is None:
+            self.driver_profile = None
+        else:
+            for field, value in state.items():
+                setattr(self.driver_profile, field, value)
+        self.profile_checked_at = time.monotonic()
+
+    @database_sync_to_async
+    def get_driver_profile(self, user):
+        return DriverProfile.objects.filter(user=user).first()
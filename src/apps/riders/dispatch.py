@@ -0,0 +1,109 @@
+"""
+Targeted ride dispatch.
+
+Instead of pushing every new ride to the whole fleet, offers go to the k
+nearest eligible drivers of the requested vehicle type through their
+personal `driver_<user_id>` group. If nobody accepts before the wave times
+out, the next wave widens the radius and skips drivers already offered.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from src.apps.drivers import geo_index
+from src.apps.drivers.utils import broadcast_ride_update
+from .models import Ride
+
+logger = logging.getLogger(__name__)
+
+OFFERED_KEY = "ride:{}:offered"
+ACTIVE_STATUSES = ['ACCEPTED', 'ARRIVED', 'STARTED']
+
+
+def driver_group(user_id):
+    return f"driver_{user_id}"
+
+
+def send_offer(driver_id, ride_data):
+    """Pushes a ride request to one driver's socket(s)."""
+    async_to_sync(get_channel_layer().group_send)(
+        driver_group(driver_id),
+        {
+            "type": "new_ride_available",
+            "data": {
+                "event": "NEW_RIDE_AVAILABLE",
+                "ride": ride_data,
+            }
+        }
+    )
+
+
+def already_offered(ride_id):
+    try:
+        return get_redis().smembers(OFFERED_KEY.format(ride_id))
+    except RedisError:
+        return set()
+
+
+def mark_offered(ride_id, driver_ids):
+    key = OFFERED_KEY.format(ride_id)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.sadd(key, *driver_ids)
+        pipe.expire(key, 3600)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Could not record offers for ride {ride_id}: {e}")
+
+
+def pick_drivers(ride, radius_km, k, exclude=()):
+    """Nearest k online drivers of the ride's type who are not on a trip."""
+    pickup = ride.pickup_location
+    candidates = geo_index.nearby_drivers(
+        pickup.y, pickup.x, radius_km,
+        vehicle_type=ride.requested_vehicle_type, count=k + len(exclude)
+    )
+    driver_ids = [user_id for user_id, _ in candidates if user_id not in exclude]
+    busy = set(Ride.objects.filter(
+        driver_id__in=driver_ids, status__in=ACTIVE_STATUSES
+    ).values_list('driver_id', flat=True))
+    return [user_id for user_id in driver_ids if user_id not in busy][:k]
+
+
+def dispatch_wave(ride_id, wave=0, ride_data=None):
+    """
+    Offers the ride to the next wave of drivers and schedules the following
+    wave. Stops as soon as the ride leaves SEARCHING.
+    """
+    from .serializers import RideSerializer
+    from .tasks import task_dispatch_wave
+
+    ride = Ride.objects.filter(id=ride_id, status='SEARCHING').first()
+    if not ride:
+        return
+
+    waves = settings.DISPATCH_WAVES
+    if wave >= len(waves):
+        broadcast_ride_update(ride.id, {
+            "type": "NO_DRIVERS_FOUND",
+            "status": ride.status
+        })
+        return
+
+    radius_km, k = waves[wave]
+    driver_ids = pick_drivers(ride, radius_km, k, exclude=already_offered(ride.id))
+    if not driver_ids:
+        # Nobody new in range: widen right away instead of waiting out the timeout
+        return dispatch_wave(ride.id, wave + 1, ride_data)
+
+    if ride_data is None:
+        ride_data = RideSerializer(ride).data
+    mark_offered(ride.id, driver_ids)
+    for driver_id in driver_ids:
+        send_offer(driver_id, ride_data)
+
+    task_dispatch_wave.apply_async((ride.id, wave + 1), countdown=settings.DISPATCH_WAVE_TIMEOUT)
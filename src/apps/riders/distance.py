@@ -0,0 +1,40 @@
+"""
+Great-circle distance on the WGS84 mean sphere (haversine).
+
+`haversine_km` is the scalar fast path (plain floats, no GEOS objects);
+`haversine_km_array` is the NumPy path for batches. Over Aruba-sized
+distances the spherical error against the ellipsoid stays well under 0.5%.
+"""
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = math.radians(lat1), math.radians(lng1), math.radians(lat2), math.radians(lng2)
+    a = (math.sin((lat2 - lat1) * 0.5) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) * 0.5) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_km_array(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) * 0.5) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) * 0.5) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def point_distance_km(point1, point2):
+    """Distance between two SRID 4326 GEOS points (x = lng, y = lat)."""
+    return haversine_km(point1.y, point1.x, point2.y, point2.x)
+
+
+def radius_degrees(radius_km, lat):
+    """
+    Radius in degrees that covers `radius_km` in every direction around
+    latitude `lat`. Used as an index-assisted `dwithin` prefilter on SRID 4326
+    geometry columns, where `distance_lte` alone cannot use the GiST index.
+    """
+    return radius_km / (math.radians(EARTH_RADIUS_KM) * math.cos(math.radians(lat)))
@@ -0,0 +1,55 @@
+import random
+import time
+
+import numpy as np
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+
+from src.apps.riders.distance import haversine_km, haversine_km_array
+
+# Rough bounding box of Aruba
+LAT_RANGE = (12.41, 12.63)
+LNG_RANGE = (-70.07, -69.87)
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark of the per-call cost of the fare distance kernels"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--n', type=int, default=100000, help="Number of trips")
+
+    def handle(self, *args, **options):
+        n = options['n']
+        rng = random.Random(42)
+        trips = [
+            (rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE), rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE))
+            for _ in range(n)
+        ]
+
+        def planar_geos():
+            # What calculate_dynamic_fare used to do: two GEOS points per call
+            for p_lat, p_lng, d_lat, d_lng in trips:
+                Point(p_lng, p_lat, srid=4326).distance(Point(d_lng, d_lat, srid=4326)) * 111.32
+
+        def scalar():
+            for p_lat, p_lng, d_lat, d_lng in trips:
+                haversine_km(p_lat, p_lng, d_lat, d_lng)
+
+        arr = np.asarray(trips)
+
+        def batched():
+            haversine_km_array(arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3])
+
+        self.stdout.write(f"{n} trips")
+        for name, fn in [("planar GEOS (old)", planar_geos), ("haversine scalar", scalar), ("haversine NumPy", batched)]:
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{name:<20} {elapsed * 1e9 / n:>10.1f} ns/call  ({elapsed:.3f}s total)")
+
+        # Accuracy of the old planar formula against haversine
+        planar = np.hypot(arr[:, 3] - arr[:, 1], arr[:, 2] - arr[:, 0]) * 111.32
+        exact = haversine_km_array(arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3])
+        mask = exact > 0.1
+        error = np.abs(planar[mask] - exact[mask]) / exact[mask] * 100
+        self.stdout.write(f"planar error vs haversine: mean {error.mean():.2f}%, max {error.max():.2f}%")
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import D
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from src.apps.payments.models import Transaction
+from src.apps.riders.distance import radius_degrees
+from src.apps.riders.models import Ride
+
+User = get_user_model()
+
+ACTIVE_STATUSES = ['ACCEPTED', 'ARRIVED', 'STARTED']
+PAGE = 21  # page size + 1, as fetched by the cursor paginator
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints EXPLAIN plans for the hot ride/transaction queries to check index use. "
+        "On small tables the planner may still prefer a sequential scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Run the queries (EXPLAIN ANALYZE)")
+
+    def handle(self, *args, **options):
+        driver = User.objects.filter(is_driver=True).values_list('pk', flat=True).first() or '000000'
+        rider = User.objects.filter(is_driver=False).values_list('pk', flat=True).first() or '000000'
+        location = Point(-70.03, 12.52, srid=4326)
+        since = timezone.now() - timedelta(days=30)
+
+        queries = [
+            ("Driver's active ride (location ping)",
+             Ride.objects.filter(driver_id=driver, status__in=ACTIVE_STATUSES).only('id', 'status')[:1]),
+            ("Driver's completed rides (earnings)",
+             Ride.objects.filter(driver_id=driver, status='COMPLETED')),
+            ("Open rides near a driver",
+             Ride.objects.filter(
+                 status='SEARCHING',
+                 pickup_location__dwithin=(location, radius_degrees(5, location.y)),
+                 pickup_location__distance_lte=(location, D(km=5)),
+             )),
+            ("Rider history page",
+             Ride.objects.filter(rider_id=rider).order_by('-created_at', '-id')[:PAGE]),
+            ("Driver history page",
+             Ride.objects.filter(driver_id=driver).order_by('-created_at', '-id')[:PAGE]),
+            ("Admin trips page",
+             Ride.objects.order_by('-created_at', '-id')[:PAGE]),
+            ("Admin transactions page",
+             Transaction.objects.filter(status='SUCCESS').order_by('-created_at', '-id')[:PAGE]),
+            ("Revenue since date (admin stats)",
+             Transaction.objects.filter(status='SUCCESS', created_at__gte=since)),
+            ("Stripe webhook lookup",
+             Transaction.objects.filter(stripe_payment_intent_id='cs_test_lookup')[:1]),
+            ("Admin users page",
+             User.objects.filter(is_rider=True).order_by('-date_joined', '-user_id')[:PAGE]),
+        ]
+
+        for name, queryset in queries:
+            plan = queryset.explain(analyze=options['analyze'])
+            uses_index = 'Index' in plan or 'Bitmap' in plan
+            style = self.style.SUCCESS if uses_index else self.style.WARNING
+            self.stdout.write(style(f"== {name} ({'index' if uses_index else 'no index'})"))
+            self.stdout.write(plan)
+            self.stdout.write("")
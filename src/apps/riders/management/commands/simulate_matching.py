@@ -0,0 +1,78 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from src.apps.riders.distance import haversine_km_array
+from src.apps.riders.matching import match
+
+# Rough bounding box of Aruba
+LAT_RANGE = (12.41, 12.63)
+LNG_RANGE = (-70.07, -69.87)
+
+
+class Command(BaseCommand):
+    help = "Simulates batch matching against the first-come race and compares pickup distance and throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=50, help="Matching windows to simulate")
+        parser.add_argument('--rides', type=int, default=40, help="Open rides per window")
+        parser.add_argument('--drivers', type=int, default=60, help="Free drivers per window")
+        parser.add_argument('--radius', type=float, default=10, help="Max pickup distance (km)")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        radius = options['radius']
+        stats = {
+            'race': {'matched': 0, 'km': 0.0, 'seconds': 0.0},
+            'batch': {'matched': 0, 'km': 0.0, 'seconds': 0.0},
+        }
+        total_rides = 0
+
+        for _ in range(options['rounds']):
+            rides = np.array([(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(options['rides'])])
+            drivers = np.array([(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(options['drivers'])])
+            total_rides += len(rides)
+
+            # Pickup distance of every (ride, driver) pair
+            km = haversine_km_array(rides[:, None, 0], rides[:, None, 1], drivers[None, :, 0], drivers[None, :, 1])
+
+            # Race: rides arrive one by one and a random in-range driver taps first
+            start = time.perf_counter()
+            taken = set()
+            for i in range(len(rides)):
+                in_range = [j for j in np.flatnonzero(km[i] <= radius) if j not in taken]
+                if in_range:
+                    j = rng.choice(in_range)
+                    taken.add(j)
+                    stats['race']['matched'] += 1
+                    stats['race']['km'] += km[i, j]
+            stats['race']['seconds'] += time.perf_counter() - start
+
+            # Batch: minimum total pickup distance over the whole window
+            start = time.perf_counter()
+            candidates = {
+                i: {j: km[i, j] for j in np.flatnonzero(km[i] <= radius)}
+                for i in range(len(rides))
+            }
+            pairs = match(candidates)
+            stats['batch']['seconds'] += time.perf_counter() - start
+            stats['batch']['matched'] += len(pairs)
+            stats['batch']['km'] += sum(pickup_km for _, _, pickup_km in pairs)
+
+        self.stdout.write(
+            f"{options['rounds']} windows x {options['rides']} rides / {options['drivers']} drivers, "
+            f"radius {radius} km"
+        )
+        for name, s in stats.items():
+            matched = s['matched']
+            avg_km = s['km'] / matched if matched else 0
+            throughput = matched / s['seconds'] if s['seconds'] else float('inf')
+            self.stdout.write(
+                f"{name:<6} matched {matched}/{total_rides} ({matched / total_rides:.0%})  "
+                f"avg pickup {avg_km:.2f} km  "
+                f"compute {s['seconds'] * 1000 / options['rounds']:.1f} ms/window  "
+                f"{throughput:,.0f} matches/s"
+            )
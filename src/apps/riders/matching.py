@@ -0,0 +1,156 @@
+"""
+Batched ride matching.
+
+Every MATCHING_WINDOW seconds the open SEARCHING rides and the free
+drivers near them are collected and paired by a minimum-cost assignment
+(Hungarian algorithm) on pickup distance. This minimises the total pickup
+distance over the batch, where a first-come race sends each ride to
+whichever nearby driver taps first. The winning pairs get offers through
+the dispatcher; acceptance still goes through AcceptRideView.
+"""
+import logging
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from src._config.redis_client import get_redis
+from src.apps.drivers import geo_index
+from .dispatch import ACTIVE_STATUSES, already_offered, mark_offered, send_offer
+from .models import Ride
+
+logger = logging.getLogger(__name__)
+
+# Cost of a pair that must not be matched (driver out of range / wrong type)
+UNMATCHABLE = 1e9
+PENDING_OFFER_KEY = "driver:{}:pending_offer"
+
+
+def solve_assignment(cost):
+    """
+    Minimum-cost assignment for a rectangular cost matrix (list of rows).
+    Returns [(row, col), ...] with every row or every column used once,
+    whichever dimension is smaller. O(n^2 m), Hungarian algorithm with potentials.
+    """
+    cost = [list(row) for row in cost]
+    if not cost or not cost[0]:
+        return []
+    transposed = len(cost) > len(cost[0])
+    if transposed:
+        cost = [list(col) for col in zip(*cost)]
+    n, m = len(cost), len(cost[0])
+
+    inf = float('inf')
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    p, way = [0] * (m + 1), [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            delta, j1 = inf, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # Walk the augmenting path back to the root
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
+def match(ride_candidates):
+    """
+    `ride_candidates` maps ride id -> {driver_id: pickup_km}. Returns
+    [(ride_id, driver_id, pickup_km), ...] minimising total pickup distance.
+    """
+    ride_ids = list(ride_candidates)
+    driver_ids = sorted({d for candidates in ride_candidates.values() for d in candidates})
+    if not ride_ids or not driver_ids:
+        return []
+
+    cost = [
+        [ride_candidates[ride_id].get(driver_id, UNMATCHABLE) for driver_id in driver_ids]
+        for ride_id in ride_ids
+    ]
+    result = []
+    for row, col in solve_assignment(cost):
+        if cost[row][col] < UNMATCHABLE:
+            result.append((ride_ids[row], driver_ids[col], cost[row][col]))
+    return result
+
+
+def _drivers_with_pending_offers(driver_ids):
+    if not driver_ids:
+        return set()
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for driver_id in driver_ids:
+            pipe.exists(PENDING_OFFER_KEY.format(driver_id))
+        return {d for d, pending in zip(driver_ids, pipe.execute()) if pending}
+    except RedisError:
+        return set()
+
+
+def _hold_driver(driver_id):
+    try:
+        get_redis().set(PENDING_OFFER_KEY.format(driver_id), 1, ex=settings.MATCHING_OFFER_TIMEOUT)
+    except RedisError as e:
+        logger.warning(f"Could not hold driver {driver_id} for an offer: {e}")
+
+
+def run_batch_matching():
+    """One matching round over every open ride. Returns the number of offers sent."""
+    from .serializers import RideSerializer
+
+    rides = list(Ride.objects.filter(status='SEARCHING').order_by('created_at')[:settings.MATCHING_MAX_BATCH])
+    if not rides:
+        return 0
+
+    ride_candidates = {}
+    for ride in rides:
+        offered = already_offered(ride.id)
+        nearby = geo_index.nearby_drivers(
+            ride.pickup_location.y, ride.pickup_location.x, settings.MATCHING_MAX_PICKUP_KM,
+            vehicle_type=ride.requested_vehicle_type
+        )
+        ride_candidates[ride.id] = {d: km for d, km in nearby if d not in offered}
+
+    all_drivers = {d for candidates in ride_candidates.values() for d in candidates}
+    unavailable = set(Ride.objects.filter(
+        driver_id__in=all_drivers, status__in=ACTIVE_STATUSES
+    ).values_list('driver_id', flat=True))
+    unavailable |= _drivers_with_pending_offers(list(all_drivers - unavailable))
+    for candidates in ride_candidates.values():
+        for driver_id in unavailable & candidates.keys():
+            del candidates[driver_id]
+
+    rides_by_id = {ride.id: ride for ride in rides}
+    pairs = match(ride_candidates)
+    for ride_id, driver_id, _ in pairs:
+        _hold_driver(driver_id)
+        mark_offered(ride_id, [driver_id])
+        send_offer(driver_id, RideSerializer(rides_by_id[ride_id]).data)
+    return len(pairs)
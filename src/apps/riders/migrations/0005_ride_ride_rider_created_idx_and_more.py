@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('riders', '0004_ride_cancellation_fee_ride_cancellation_reason_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(fields=['rider', '-created_at', '-id'], name='ride_rider_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(fields=['driver', '-created_at', '-id'], name='ride_driver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(fields=['-created_at', '-id'], name='ride_created_idx'),
+        ),
+    ]
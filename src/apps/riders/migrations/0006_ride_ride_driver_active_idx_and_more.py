@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 11:03
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('riders', '0005_ride_ride_rider_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(condition=models.Q(('status__in', ['ACCEPTED', 'ARRIVED', 'STARTED'])), fields=['driver', 'status'], name='ride_driver_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ride',
+            index=django.contrib.postgres.indexes.GistIndex(condition=models.Q(('status', 'SEARCHING')), fields=['pickup_location'], name='ride_searching_pickup_gist'),
+        ),
+    ]
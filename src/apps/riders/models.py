@@ -1,8 +1,15 @@
 from django.contrib.gis.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GistIndex
 
 User = get_user_model()
 
+class RideQuerySet(models.QuerySet):
+    def with_details(self):
+        """Joins everything RideSerializer reads, so a list serializes in one query."""
+        return self.select_related('rider', 'driver__driver_profile', 'transaction', 'review')
+
+
 class Ride(models.Model):
     STATUS_CHOICES = [
         ('SEARCHING', 'Searching for Driver'),
@@ -39,6 +46,26 @@ class Ride(models.Model):
     cancellation_reason = models.TextField(null=True, blank=True)
     cancellation_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
 
+    objects = RideQuerySet.as_manager()
+
+    class Meta:
+        # Match the cursor pagination ordering of the history and admin lists
+        indexes = [
+            models.Index(fields=['rider', '-created_at', '-id'], name='ride_rider_created_idx'),
+            models.Index(fields=['driver', '-created_at', '-id'], name='ride_driver_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='ride_created_idx'),
+            # A driver's current trip, looked up on every location ping
+            models.Index(
+                fields=['driver', 'status'], name='ride_driver_active_idx',
+                condition=models.Q(status__in=['ACCEPTED', 'ARRIVED', 'STARTED']),
+            ),
+            # Open requests near a driver (AvailableRidesView)
+            GistIndex(
+                fields=['pickup_location'], name='ride_searching_pickup_gist',
+                condition=models.Q(status='SEARCHING'),
+            ),
+        ]
+
 
 class RideRequest(models.Model):
     STATUS = [
@@ -0,0 +1,240 @@
+"""
+Pluggable routing engine for fares and ETAs.
+
+`straight_line` (default) keeps the old model: great-circle distance at an
+average 40 km/h. `osm` loads an offline road graph of the island from an
+OpenStreetMap XML extract (convert a .pbf with `osmium cat aruba.osm.pbf -o aruba.osm`),
+packs it into CSR arrays and answers fastest-path queries with A*. The packed
+graph is saved next to the extract as `<extract>.npz` so later starts skip
+the XML parse. Results are kept in an LRU cache keyed by the snapped
+origin/destination road nodes.
+"""
+import heapq
+import logging
+import math
+import os
+import threading
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from .distance import haversine_km
+
+logger = logging.getLogger(__name__)
+
+AVERAGE_SPEED_KMH = 40
+# Speed for the leg between the exact pickup/dropoff and the nearest road node
+ACCESS_SPEED_KMH = 20
+# Used when no road path exists between the two snapped nodes
+DETOUR_FACTOR = 1.3
+
+# Default speeds (km/h) for roads without a usable maxspeed tag
+HIGHWAY_SPEEDS_KMH = {
+    'motorway': 90, 'motorway_link': 50,
+    'trunk': 80, 'trunk_link': 45,
+    'primary': 60, 'primary_link': 40,
+    'secondary': 50, 'secondary_link': 35,
+    'tertiary': 40, 'tertiary_link': 30,
+    'unclassified': 35, 'residential': 30,
+    'living_street': 10, 'service': 20,
+}
+
+# Grid cell size (degrees, ~550 m) for nearest-node lookups
+GRID_CELL_DEG = 0.005
+
+
+class StraightLineEngine:
+    name = 'straight_line'
+
+    def route(self, lat1, lng1, lat2, lng2):
+        """Returns (distance_km, duration_minutes)."""
+        distance_km = haversine_km(lat1, lng1, lat2, lng2)
+        return distance_km, distance_km / AVERAGE_SPEED_KMH * 60
+
+
+def _parse_speed(maxspeed):
+    if not maxspeed:
+        return None
+    value = maxspeed.split(';')[0].strip()
+    factor = 1.609344 if value.endswith('mph') else 1.0
+    try:
+        return float(value.replace('mph', '').replace('km/h', '').strip()) * factor
+    except ValueError:
+        return None
+
+
+def _load_osm(path):
+    """Parses an OSM XML extract into edge arrays of the drivable road graph."""
+    coords = {}
+    ways = []
+    for _, elem in ET.iterparse(path, events=('end',)):
+        if elem.tag == 'node':
+            coords[int(elem.get('id'))] = (float(elem.get('lat')), float(elem.get('lon')))
+            elem.clear()
+        elif elem.tag == 'way':
+            tags = {tag.get('k'): tag.get('v') for tag in elem.iter('tag')}
+            highway = tags.get('highway')
+            if (highway in HIGHWAY_SPEEDS_KMH and tags.get('access') not in ('no', 'private')
+                    and tags.get('area') != 'yes'):
+                speed = _parse_speed(tags.get('maxspeed')) or HIGHWAY_SPEEDS_KMH[highway]
+                oneway = tags.get('oneway')
+                if oneway is None and (tags.get('junction') == 'roundabout' or highway == 'motorway'):
+                    oneway = 'yes'
+                refs = [int(nd.get('ref')) for nd in elem.iter('nd')]
+                ways.append((refs, speed, oneway))
+            elem.clear()
+        elif elem.tag == 'relation':
+            elem.clear()
+
+    index = {}
+    edges = []
+    for refs, speed, oneway in ways:
+        refs = [ref for ref in refs if ref in coords]
+        if oneway == '-1':
+            refs.reverse()
+        forward_only = oneway in ('yes', '1', 'true', '-1')
+        for a, b in zip(refs, refs[1:]):
+            ia = index.setdefault(a, len(index))
+            ib = index.setdefault(b, len(index))
+            length = haversine_km(*coords[a], *coords[b])
+            edges.append((ia, ib, length, speed))
+            if not forward_only:
+                edges.append((ib, ia, length, speed))
+
+    if not edges:
+        raise ValueError(f"No drivable roads found in {path}")
+
+    node_ids = sorted(index, key=index.get)
+    lat = np.array([coords[n][0] for n in node_ids], dtype=np.float64)
+    lng = np.array([coords[n][1] for n in node_ids], dtype=np.float64)
+    src, dst, lengths, speeds = (np.array(column) for column in zip(*edges))
+    return lat, lng, src.astype(np.int64), dst.astype(np.int64), lengths, speeds
+
+
+class OSMRoadEngine:
+    name = 'osm'
+
+    def __init__(self, path, cache_size=10000):
+        cache_path = f"{path}.npz"
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            data = np.load(cache_path)
+            lat, lng, indptr, indices, lengths, times = (
+                data['lat'], data['lng'], data['indptr'], data['indices'], data['lengths'], data['times']
+            )
+        else:
+            lat, lng, src, dst, edge_lengths, edge_speeds = _load_osm(path)
+            # Pack edges into CSR form: outgoing edges of node n are indptr[n]:indptr[n + 1]
+            order = np.argsort(src, kind='stable')
+            indices = dst[order].astype(np.int32)
+            lengths = edge_lengths[order]
+            times = lengths / edge_speeds[order] * 60
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=len(lat)))]).astype(np.int64)
+            try:
+                np.savez(cache_path, lat=lat, lng=lng, indptr=indptr, indices=indices, lengths=lengths, times=times)
+            except OSError as e:
+                logger.warning(f"Could not write road graph cache {cache_path}: {e}")
+
+        # Plain lists are much faster than NumPy scalars inside the search loop
+        self.lat, self.lng = lat.tolist(), lng.tolist()
+        self.indptr, self.indices = indptr.tolist(), indices.tolist()
+        self.lengths, self.times = lengths.tolist(), times.tolist()
+        speeds = [l / t * 60 for l, t in zip(self.lengths, self.times) if t > 0]
+        self.max_speed_kmh = max(speeds, default=AVERAGE_SPEED_KMH)
+
+        self.grid = {}
+        for node, (node_lat, node_lng) in enumerate(zip(self.lat, self.lng)):
+            self.grid.setdefault(self._cell(node_lat, node_lng), []).append(node)
+
+        self._route_nodes = lru_cache(maxsize=cache_size)(self._astar)
+        logger.info(f"Loaded road graph {path}: {len(self.lat)} nodes, {len(self.indices)} edges")
+
+    @staticmethod
+    def _cell(lat, lng):
+        return int(math.floor(lat / GRID_CELL_DEG)), int(math.floor(lng / GRID_CELL_DEG))
+
+    def nearest_node(self, lat, lng, max_rings=6):
+        """Closest graph node, searching grid rings outward from the point's cell."""
+        row, col = self._cell(lat, lng)
+        best, best_distance, found_ring = None, math.inf, None
+        for ring in range(max_rings + 1):
+            for r in range(row - ring, row + ring + 1):
+                for c in range(col - ring, col + ring + 1):
+                    if max(abs(r - row), abs(c - col)) != ring:
+                        continue
+                    for node in self.grid.get((r, c), ()):
+                        distance = haversine_km(lat, lng, self.lat[node], self.lng[node])
+                        if distance < best_distance:
+                            best, best_distance = node, distance
+            # One extra ring after the first hit catches closer nodes just across a cell border
+            if best is not None and found_ring is None:
+                found_ring = ring
+            elif found_ring is not None:
+                break
+        return best, best_distance
+
+    def _astar(self, source, target):
+        """Fastest path by travel time. Returns (distance_km, minutes) or None."""
+        if source == target:
+            return 0.0, 0.0
+        lat, lng, indptr, indices, lengths, times = (
+            self.lat, self.lng, self.indptr, self.indices, self.lengths, self.times
+        )
+        target_lat, target_lng = lat[target], lng[target]
+        minutes_per_km = 60 / self.max_speed_kmh
+
+        best_time = {source: 0.0}
+        best_distance = {source: 0.0}
+        closed = set()
+        heap = [(haversine_km(lat[source], lng[source], target_lat, target_lng) * minutes_per_km, source)]
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == target:
+                return best_distance[node], best_time[node]
+            if node in closed:
+                continue
+            closed.add(node)
+            node_time = best_time[node]
+            for edge in range(indptr[node], indptr[node + 1]):
+                nxt = indices[edge]
+                candidate = node_time + times[edge]
+                if candidate < best_time.get(nxt, math.inf):
+                    best_time[nxt] = candidate
+                    best_distance[nxt] = best_distance[node] + lengths[edge]
+                    estimate = haversine_km(lat[nxt], lng[nxt], target_lat, target_lng) * minutes_per_km
+                    heapq.heappush(heap, (candidate + estimate, nxt))
+        return None
+
+    def route(self, lat1, lng1, lat2, lng2):
+        """Returns (distance_km, duration_minutes) along the road network."""
+        source, source_access = self.nearest_node(lat1, lng1)
+        target, target_access = self.nearest_node(lat2, lng2)
+        result = self._route_nodes(source, target) if source is not None and target is not None else None
+        if result is None:
+            distance_km = haversine_km(lat1, lng1, lat2, lng2) * DETOUR_FACTOR
+            return distance_km, distance_km / AVERAGE_SPEED_KMH * 60
+
+        access_km = source_access + target_access
+        distance_km, minutes = result
+        return distance_km + access_km, minutes + access_km / ACCESS_SPEED_KMH * 60
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_routing_engine():
+    """Process-wide engine chosen by settings.ROUTING_ENGINE, loaded on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = StraightLineEngine()
+                if settings.ROUTING_ENGINE == 'osm':
+                    try:
+                        engine = OSMRoadEngine(settings.ROAD_GRAPH_PATH, settings.ROUTE_CACHE_SIZE)
+                    except (OSError, ET.ParseError, ValueError) as e:
+                        logger.error(f"Road graph unavailable, using straight-line routing: {e}")
+                _engine = engine
+    return _engine
@@ -69,11 +69,12 @@ class RideSerializer(serializers.ModelSerializer):
         validated_data['pickup_location'] = Point(p_lng, p_lat, srid=4326)
         validated_data['dropoff_location'] = Point(d_lng, d_lat, srid=4326)
         
-        # Calculate Dynamic Fare
-        validated_data['estimated_price'] = calculate_dynamic_fare(
-            validated_data['pickup_location'],
-            validated_data['dropoff_location'],
-            v_type
-        )
+        # Calculate Dynamic Fare (unless the view already priced it)
+        if 'estimated_price' not in validated_data:
+            validated_data['estimated_price'] = calculate_dynamic_fare(
+                validated_data['pickup_location'],
+                validated_data['dropoff_location'],
+                v_type
+            )
         
         return super().create(validated_data)
\ No newline at end of file
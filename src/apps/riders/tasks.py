@@ -1,19 +1,16 @@
 from celery import shared_task
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from src.apps.drivers.utils import broadcast_ride_update, location_update_payload
 
 @shared_task
-def task_broadcast_location(ride_id, lat, lng, status):
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f'ride_{ride_id}',
-        {
-            'type': 'ride_update',
-            'data': {
-                "type": "LOCATION_UPDATE",
-                "lat": lat,
-                "lng": lng,
-                "status": status
-            }
-        }
-    )
\ No newline at end of file
+def task_broadcast_location(ride_id, lat, lng, status, driver_id=None):
+    broadcast_ride_update(ride_id, location_update_payload(lat, lng, status, driver_id))
+
+@shared_task
+def task_dispatch_wave(ride_id, wave):
+    from .dispatch import dispatch_wave
+    dispatch_wave(ride_id, wave)
+
+@shared_task
+def task_run_batch_matching():
+    from .matching import run_batch_matching
+    return run_batch_matching()
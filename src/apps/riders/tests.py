@@ -1,3 +1,63 @@
+from django.contrib.gis.geos import Point
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from src.apps.accounts.models import DriverProfile, User
+from src.apps.payments.models import Transaction
+from .models import Ride, RideReview
+
+
+class RideListQueryCountTests(TestCase):
+    """Ride lists must not issue extra queries per ride."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # A stripe_customer_id skips the Stripe call in the post_save signal
+        cls.rider = User.objects.create_user(
+            'rider@example.com', 'pass', full_name='Rider', phone_number='100', stripe_customer_id='cus_rider'
+        )
+        cls.driver = User.objects.create_user(
+            'driver@example.com', 'pass', full_name='Driver', phone_number='200',
+            is_driver=True, stripe_customer_id='cus_driver'
+        )
+        DriverProfile.objects.create(
+            user=cls.driver, gender='M', vehicle_type='ECONOMY',
+            vehicle_brand='Toyota', vehicle_model='Yaris', vehicle_plate='A-1'
+        )
+
+    def add_rides(self, count):
+        for _ in range(count):
+            ride = Ride.objects.create(
+                rider=self.rider, driver=self.driver, status='COMPLETED',
+                pickup_location=Point(-70.03, 12.52, srid=4326),
+                dropoff_location=Point(-69.96, 12.50, srid=4326),
+                pickup_address='A', dropoff_address='B', estimated_price=10,
+            )
+            Transaction.objects.create(ride=ride, amount=10, status='SUCCESS')
+            RideReview.objects.create(ride=ride, rider=self.rider, driver=self.driver, rating=5)
+
+    def count_queries(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assert_constant_queries(self, user, url):
+        self.add_rides(1)
+        baseline = self.count_queries(user, url)
+        self.add_rides(10)
+        self.assertEqual(self.count_queries(user, url), baseline)
+
+    def test_rider_history(self):
+        self.assert_constant_queries(self.rider, reverse('all_ride_history'))
+
+    def test_driver_history(self):
+        self.assert_constant_queries(self.driver, reverse('all_ride_history'))
+
+    def test_driver_trip_history(self):
+        self.assert_constant_queries(self.driver, reverse('driver_trip_history'))
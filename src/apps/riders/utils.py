@@ -1,34 +1,106 @@
 from decimal import Decimal
 
-from src.apps.dashboard.models import PriceConfig
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from redis.exceptions import RedisError
 
-def calculate_dynamic_fare(pickup_point, dropoff_point, vehicle_type):
+from src.apps.dashboard.services import get_price_config
+from .distance import haversine_km_array
+from .road_network import get_routing_engine
+
+VEHICLE_TYPES = ['ECONOMY', 'XL', 'PREMIUM']
+
+def fare_for_distance(distance_km, vehicle_type, duration_minutes=None):
     """
     The Official Aruba Calculation Formula
     """
-    try:
-        # 1. Fetch the config from DB
-        config = PriceConfig.objects.get(vehicle_type=vehicle_type)
-    except PriceConfig.DoesNotExist:
+    # 1. Fetch the config from the in-process cache
+    config = get_price_config(vehicle_type)
+    if config is None:
         # Fallback to a default if the Admin hasn't set it up yet
         return Decimal('15.00')
 
-    # 2. Calculate Distance (PostGIS distance is in degrees, roughly * 111 for KM)
-    distance_km = Decimal(str(pickup_point.distance(dropoff_point) * 111.32))
+    distance_km = Decimal(str(distance_km))
     
-    # 3. Estimate Duration (Distance / Average Speed of 40km/h * 60 minutes)
+    # 2. Estimate Duration (routing engine, else Distance / Average Speed of 40km/h * 60 minutes)
     # This fulfills the 'price_per_minute' requirement
-    estimated_minutes = (distance_km / Decimal('40')) * Decimal('60')
+    if duration_minutes is not None:
+        estimated_minutes = Decimal(str(duration_minutes))
+    else:
+        estimated_minutes = (distance_km / Decimal('40')) * Decimal('60')
 
-    # 4. Apply Formula: Base + (Dist * Rate) + (Time * Rate)
+    # 3. Apply Formula: Base + (Dist * Rate) + (Time * Rate)
     fare_subtotal = (
         config.base_fare + 
         (distance_km * config.price_per_km) + 
         (estimated_minutes * config.price_per_minute)
     )
 
-    # 5. Add Aruba Tax (BBO/BAVP/BAZV)
+    # 4. Add Aruba Tax (BBO/BAVP/BAZV)
     tax_multiplier = 1 + (config.aruba_tax_percentage / Decimal('100'))
     final_fare = fare_subtotal * tax_multiplier
 
-    return round(final_fare, 2)
\ No newline at end of file
+    return round(final_fare, 2)
+
+
+def route_trip(pickup_lat, pickup_lng, dropoff_lat, dropoff_lng):
+    """
+    (distance_km, duration_minutes) for a trip, shared across workers through
+    the 'fares' cache so the estimate and the ride request route it once.
+    Coordinates are rounded to ~1 m for the key.
+    """
+    key = "route:{:.5f}:{:.5f}:{:.5f}:{:.5f}:{}".format(
+        pickup_lat, pickup_lng, dropoff_lat, dropoff_lng, settings.ROUTING_ENGINE
+    )
+    try:
+        route = caches['fares'].get(key)
+    except RedisError:
+        route = None
+    if route is None:
+        route = get_routing_engine().route(pickup_lat, pickup_lng, dropoff_lat, dropoff_lng)
+        try:
+            caches['fares'].set(key, route)
+        except RedisError:
+            pass
+    return route
+
+
+def calculate_dynamic_fare(pickup_point, dropoff_point, vehicle_type):
+    distance_km, duration_minutes = route_trip(
+        pickup_point.y, pickup_point.x, dropoff_point.y, dropoff_point.x
+    )
+    return fare_for_distance(distance_km, vehicle_type, duration_minutes)
+
+
+def quote_fares_bulk(trips, vehicle_types=None):
+    """
+    Vectorized fare_for_distance for many trips in one call.
+
+    `trips` is an (n, 4) array-like of [pickup_lat, pickup_lng, dropoff_lat, dropoff_lng].
+    Returns (distance_km, {vehicle_type: fares}) as NumPy arrays. Always uses
+    straight-line distance at 40 km/h, whatever the routing engine. Float
+    arithmetic can differ from the Decimal path by a cent on exact half-cent ties.
+    """
+    trips = np.asarray(trips, dtype=np.float64).reshape(-1, 4)
+    p_lat, p_lng, d_lat, d_lng = trips.T
+
+    # Same distance and duration model as fare_for_distance
+    distance_km = haversine_km_array(p_lat, p_lng, d_lat, d_lng)
+    estimated_minutes = distance_km / 40 * 60
+
+    fares = {}
+    for v_type in vehicle_types or VEHICLE_TYPES:
+        config = get_price_config(v_type)
+        if config is None:
+            fares[v_type] = np.full(len(trips), 15.0)
+            continue
+        subtotal = (
+            float(config.base_fare)
+            + distance_km * float(config.price_per_km)
+            + estimated_minutes * float(config.price_per_minute)
+        )
+        tax_multiplier = 1 + float(config.aruba_tax_percentage) / 100
+        fares[v_type] = np.round(subtotal * tax_multiplier, 2)
+
+    return distance_km, fares
@@ -1,20 +1,22 @@
+import math
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from django.contrib.gis.db.models.functions import Distance
-from django.contrib.gis.measure import D
 from django.contrib.gis.geos import Point
 from decimal import Decimal
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 
 from .models import Ride, RideReview
 from .serializers import RideSerializer
-from src.apps.accounts.models import DriverProfile
 from src.apps.accounts.permissions import IsRider
-from .utils import calculate_dynamic_fare
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .utils import calculate_dynamic_fare, fare_for_distance, route_trip, VEHICLE_TYPES
+from .road_network import get_routing_engine
+from .dispatch import dispatch_wave
 from src.apps.drivers.utils import broadcast_ride_update
+from src.apps.drivers import geo_index
+from src.apps.drivers.stats import record_review
+from src._config.pagination import CreatedAtCursorPagination
 
 
 class FareEstimateView(APIView):
@@ -31,34 +33,39 @@ class FareEstimateView(APIView):
         if not all([pickup_lat, pickup_lng, dropoff_lat, dropoff_lng]):
             return Response({"error": "All coordinates are required"}, status=400)
 
-        pickup_point = Point(float(pickup_lng), float(pickup_lat), srid=4326)
-        dropoff_point = Point(float(dropoff_lng), float(dropoff_lat), srid=4326)
-        distance_km = round(pickup_point.distance(dropoff_point) * 111.32, 2)
+        pickup_lat, pickup_lng = float(pickup_lat), float(pickup_lng)
+        engine = get_routing_engine()
+        distance_km, duration_minutes = route_trip(pickup_lat, pickup_lng, float(dropoff_lat), float(dropoff_lng))
 
-        vehicle_types = ['ECONOMY', 'XL', 'PREMIUM']
         estimates = []
 
-        for v_type in vehicle_types:
-            price = calculate_dynamic_fare(pickup_point, dropoff_point, v_type)
-            available_drivers = DriverProfile.objects.filter(
-                is_active=True,
-                is_online=True,
-                vehicle_type=v_type,
-                last_location__distance_lte=(pickup_point, D(km=10))
-            ).count()
+        for v_type in VEHICLE_TYPES:
+            price = fare_for_distance(distance_km, v_type, duration_minutes)
+            drivers = geo_index.nearby_drivers(pickup_lat, pickup_lng, 10, vehicle_type=v_type)
+
+            # ETA: road time from the nearest driver of this type to the pickup
+            eta_minutes = None
+            if drivers:
+                position = geo_index.get_position(drivers[0][0])
+                if position:
+                    _, minutes = engine.route(position[0], position[1], pickup_lat, pickup_lng)
+                    eta_minutes = max(1, math.ceil(minutes))
+                else:
+                    eta_minutes = 5
 
             estimates.append({
                 "vehicle_type": v_type,
                 "estimated_price": str(price),
                 "currency": "AWG",
-                "available_drivers": available_drivers,
-                "eta_minutes": 5 if available_drivers > 0 else None
+                "available_drivers": len(drivers),
+                "eta_minutes": eta_minutes
             })
 
         return Response({
             "pickup_address": pickup_address,
             "dropoff_address": dropoff_address,
-            "distance_km": distance_km,
+            "distance_km": round(distance_km, 2),
+            "duration_minutes": round(duration_minutes, 1),
             "estimates": estimates
         })
 
@@ -69,7 +76,7 @@ class CreateRideView(APIView):
     def post(self, request):
         serializer = RideSerializer(data=request.data)
         if serializer.is_valid():
-            v_type = request.data.get('requested_vehicle_type', 'ECONOMY')
+            v_type = serializer.validated_data.get('vehicle_type', 'ECONOMY')
             p_lat = serializer.validated_data['pickup_lat']
             p_lng = serializer.validated_data['pickup_lng']
             d_lat = serializer.validated_data['dropoff_lat']
@@ -86,30 +93,17 @@ class CreateRideView(APIView):
                 status='SEARCHING'
             )
             
-            nearby_drivers = DriverProfile.objects.filter(
-                is_active=True,
-                is_online=True,
-                last_location__distance_lte=(ride.pickup_location, D(km=5))
-            ).annotate(
-                distance=Distance('last_location', ride.pickup_location)
-            ).order_by('distance')
-
-            channel_layer = get_channel_layer()
+            nearby_drivers = geo_index.nearby_drivers(p_lat, p_lng, 5)
+
             ride_data = RideSerializer(ride).data
-            
-            async_to_sync(channel_layer.group_send)(
-                "drivers_discovery",
-                {
-                    "type": "new_ride_available",
-                    "data": {
-                        "event": "NEW_RIDE_AVAILABLE",
-                        "ride": ride_data,
-                    }
-                }
-            )
 
-            response_data = ride_data
-            response_data['nearby_drivers_count'] = nearby_drivers.count()
+            # Offer the ride to the nearest eligible drivers only, in widening waves.
+            # With batch matching on, the next matching round picks it up instead.
+            if not settings.BATCH_MATCHING_ENABLED:
+                dispatch_wave(ride.id, 0, ride_data)
+
+            response_data = dict(ride_data)
+            response_data['nearby_drivers_count'] = len(nearby_drivers)
             
             return Response(response_data, status=status.HTTP_201_CREATED)
             
@@ -121,19 +115,21 @@ class RideHistoryView(APIView):
 
     def get(self, request):
         if request.user.is_driver:
-            rides = Ride.objects.filter(driver=request.user).order_by('-created_at')
+            rides = Ride.objects.with_details().filter(driver=request.user)
         else:
-            rides = Ride.objects.filter(rider=request.user).order_by('-created_at')
-        
-        serializer = RideSerializer(rides, many=True)
-        return Response(serializer.data)
+            rides = Ride.objects.with_details().filter(rider=request.user)
+
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(rides, request, view=self)
+        serializer = RideSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class RideDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, ride_id):
-        ride = get_object_or_404(Ride, id=ride_id)
+        ride = get_object_or_404(Ride.objects.with_details(), id=ride_id)
         if ride.rider != request.user and ride.driver != request.user:
             return Response({"error": "Not authorized"}, status=403)
         return Response(RideSerializer(ride).data)
@@ -184,12 +180,13 @@ class RideReviewView(APIView):
         rating = request.data.get('rating')
         comment = request.data.get('comment', '')
         
-        RideReview.objects.create(
+        review = RideReview.objects.create(
             ride=ride,
             rider=request.user,
             driver=ride.driver,
             rating=rating,
             comment=comment
         )
-        
+        record_review(review)
+
         return Response({"message": "Review submitted"})
\ No newline at end of file